@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (  # noqa: E402
+    WORDS,
+    DummyInlineQuery,
+    DummyMessage,
+    DummyState,
+)
+from cache import collection_cache  # noqa: E402
+from db import (  # noqa: E402
+    init_db,
+    load_films,
+    save_film,
+    save_films_bulk,
+    update_film_field,
+)
+from db_pool import db_pool  # noqa: E402
+from fuzzy import name_indexes  # noqa: E402
+from handlers import inline, inspect  # noqa: E402
+from similarity import tfidf_indexes  # noqa: E402
+from utils import find_similar_films_by_description  # noqa: E402
+
+GENRES = ("Drama", "Comedy", "Crime", "Horror", "Sci-Fi", "Action", "Romance")
+# Лише значення, які приймають валідатори бота
+TAGS = ("viewed", "not viewed")
+REVIEWS = ("like", "dislike", None)
+QUERY = "a detective and a robber plan a heist in the city at night"
+# Inline-запити приходять на кожну клавішу
+KEYSTROKES = ("f", "fi", "fil", "film", "film ", "film 1", "film 12", "flim 123")
+
+
+def make_films(count: int, seed=42):
+    rnd = random.Random(seed + count)
+    for i in range(count):
+        yield {
+            "name": f"Film {i}",
+            "rating": round(rnd.uniform(1, 10), 1),
+            "year": rnd.randint(1950, 2024),
+            "genre": ", ".join(rnd.sample(GENRES, k=rnd.randint(1, 2))),
+            "description": " ".join(rnd.choices(WORDS, k=40)),
+            "tag": rnd.choice(TAGS),
+            "review": rnd.choice(REVIEWS),
+        }
+
+
+async def populate(user_id: int, count: int):
+    # save_film комітить кожен фільм окремо і для 50k надто повільний
+    await save_films_bulk(user_id, make_films(count), chunk_size=5000)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(
+            ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3
+        ),
+        "p99_ms": round(
+            ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3
+        ),
+        "min_ms": round(ordered[0] * 1000, 3),
+    }
+
+
+async def measure(func, repeat: int, setup=None):
+    samples = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = func(i)
+        if asyncio.iscoroutine(result):
+            await result
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def handler_call(handler, user_id: int, text: str):
+    async def call(_):
+        await handler(DummyMessage(text, user_id), DummyState())
+
+    return call
+
+
+def cold():
+    collection_cache.clear()
+    tfidf_indexes.clear()
+    name_indexes.clear()
+
+
+async def bench_size(size: int, repeat: int):
+    user_id = size
+    await populate(user_id, size)
+    films = await load_films(user_id)
+    sample_name = f"Film {size // 2}"
+    sample = films[sample_name]
+    updated = dict(films["Film 0"])
+    # difflib перебирає всі описи, тому на великих колекціях запускаємо менше разів
+    slow_repeat = max(1, repeat * 100 // max(size, 100))
+
+    results = {
+        "load_films_cold": await measure(
+            lambda _: load_films(user_id), repeat, setup=cold
+        ),
+        "load_films_warm": await measure(lambda _: load_films(user_id), repeat),
+        "save_film_insert": await measure(
+            lambda i: save_film(user_id, {**sample, "name": f"New film {i}"}),
+            repeat,
+        ),
+        "save_film_update": await measure(
+            # Повний запис, щоб не затерти решту полів для наступних замірів
+            lambda i: save_film(
+                user_id, {**updated, "name": "Film 0", "rating": 1 + i % 9}
+            ),
+            repeat,
+        ),
+        "update_film_field": await measure(
+            lambda i: update_film_field(user_id, "Film 1", "rating", 1 + i % 9),
+            repeat,
+        ),
+    }
+    handlers = {
+        "inspect_all_films": lambda _: inspect.inspect_all_films(
+            DummyMessage("Inspect all films", user_id)
+        ),
+        "film_by_name": handler_call(inspect.film_by_name, user_id, sample_name),
+        "film_by_rating": handler_call(
+            inspect.film_by_rating, user_id, str(sample["rating"])
+        ),
+        "film_by_year": handler_call(
+            inspect.film_by_year, user_id, str(sample["year"])
+        ),
+        "film_by_genre": handler_call(inspect.film_by_genre, user_id, "Drama"),
+        "film_by_tag": handler_call(inspect.get_film_by_tag, user_id, "viewed"),
+        "film_by_description": handler_call(
+            inspect.film_by_description, user_id, QUERY
+        ),
+        "random_film": handler_call(
+            inspect.random_film_handler, user_id, "From own collection"
+        ),
+    }
+    for name, call in handlers.items():
+        results[name] = await measure(call, repeat)
+    results["inline_query"] = await measure(
+        lambda i: inline.inline_search(
+            DummyInlineQuery(KEYSTROKES[i % len(KEYSTROKES)], user_id=user_id)
+        ),
+        repeat,
+    )
+
+    films = await load_films(user_id)
+    results["find_similar_difflib"] = await measure(
+        lambda _: find_similar_films_by_description(QUERY, films), slow_repeat
+    )
+    # Індекс будується при першому пошуку, міряємо вже готовий
+    find_similar_films_by_description(QUERY, films, engine="tfidf", user_id=user_id)
+    results["find_similar_tfidf"] = await measure(
+        lambda _: find_similar_films_by_description(
+            QUERY, films, engine="tfidf", user_id=user_id
+        ),
+        repeat,
+    )
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main_async(args):
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        db_pool.path = os.path.join(tmp, "bench.db")
+        await init_db()
+        try:
+            for size in args.sizes:
+                report["sizes"][str(size)] = await bench_size(size, args.repeat)
+        finally:
+            await db_pool.close()
+    return report
+
+
+def compare(report, baseline):
+    for size, results in report["sizes"].items():
+        old_results = baseline.get("sizes", {}).get(size, {})
+        for name, data in results.items():
+            old = old_results.get(name)
+            if old and old["p50_ms"]:
+                data["p50_vs_baseline"] = round(data["p50_ms"] / old["p50_ms"], 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time db.py, inspect handlers and description search"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 10000, 50000]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare with")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+    print(
+        f"{'films':>8} {'operation':<24} {'p50 ms':>10} {'p95 ms':>10} "
+        f"{'p99 ms':>10} {'vs base':>8}"
+    )
+    for size, results in report["sizes"].items():
+        for name, data in results.items():
+            print(
+                f"{size:>8} {name:<24} {data['p50_ms']:>10} {data['p95_ms']:>10} "
+                f"{data['p99_ms']:>10} {data.get('p50_vs_baseline', ''):>8}"
+            )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
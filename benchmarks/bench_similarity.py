@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import WORDS  # noqa: E402
+from similarity import TfidfIndex  # noqa: E402
+from utils import find_similar_films_by_description  # noqa: E402
+
+
+def make_films(count: int, seed=42):
+    rnd = random.Random(seed)
+    return {
+        f"Film {i}": {"description": " ".join(rnd.choices(WORDS, k=40))}
+        for i in range(count)
+    }
+
+
+def timed(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def run(sizes, queries: int):
+    rows = []
+    query = "a detective and a robber plan a heist in the city at night"
+    for size in sizes:
+        films = make_films(size)
+        repeat = max(1, queries // max(1, size // 100))
+        difflib_ms, _ = timed(
+            lambda: find_similar_films_by_description(query, films), repeat
+        )
+        build_ms, index = timed(lambda: TfidfIndex.from_films(films), 1)
+        index.search(query)
+        tfidf_ms, _ = timed(lambda: index.search(query), queries)
+        rows.append(
+            {
+                "films": size,
+                "difflib_ms": round(difflib_ms, 3),
+                "tfidf_build_ms": round(build_ms, 3),
+                "tfidf_query_ms": round(tfidf_ms, 3),
+                "speedup": round(difflib_ms / tfidf_ms, 1) if tfidf_ms else None,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare difflib and TF-IDF description search"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.queries)
+    print(f"{'films':>8} {'difflib ms':>12} {'build ms':>10} {'tfidf ms':>10} {'x':>8}")
+    for row in rows:
+        print(
+            f"{row['films']:>8} {row['difflib_ms']:>12} {row['tfidf_build_ms']:>10} "
+            f"{row['tfidf_query_ms']:>10} {row['speedup']:>8}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+import tmdb  # noqa: E402
+from db import init_db  # noqa: E402
+from db_pool import db_pool  # noqa: E402
+from http_client import close_http_session  # noqa: E402
+from tmdb import tmdb_latency  # noqa: E402
+from utils import search_tmdb_film  # noqa: E402
+
+VIDEOS = {"results": [{"type": "Trailer", "site": "YouTube", "key": "abc"}]}
+
+
+def make_stub(latency: float, append_videos: bool):
+    async def search(request):
+        await asyncio.sleep(latency)
+        movie_id = abs(hash(request.query["query"])) % 10**6
+        return web.json_response({"results": [{"id": movie_id}]})
+
+    async def details(request):
+        await asyncio.sleep(latency)
+        movie = {"id": int(request.match_info["id"]), "title": "Stub"}
+        if append_videos and request.query.get("append_to_response") == "videos":
+            movie["videos"] = VIDEOS
+        return web.json_response(movie)
+
+    async def videos(request):
+        await asyncio.sleep(latency)
+        return web.json_response(VIDEOS)
+
+    app = web.Application()
+    app.router.add_get("/search/movie", search)
+    app.router.add_get("/movie/{id}", details)
+    app.router.add_get("/movie/{id}/videos", videos)
+    return app
+
+
+async def run_mode(mode: str, lookups: int, latency: float):
+    server = TestServer(make_stub(latency, append_videos=(mode == "append")))
+    await server.start_server()
+    tmdb.TMDB_API_URL = str(server.make_url("")).rstrip("/")
+    tmdb.TMDB_APPEND_TO_RESPONSE = mode != "gather"
+    tmdb_latency.clear()
+    try:
+        for i in range(lookups):
+            # Унікальні назви, щоб не потрапляти в кеш
+            await search_tmdb_film(f"{mode} title {i}", "en")
+    finally:
+        await close_http_session()
+        await server.close()
+    return tmdb_latency.summary()
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_pool.path = os.path.join(tmp, "bench.db")
+        await init_db()
+        results = {}
+        # serial: сервер без append_to_response, три послідовні запити
+        for mode in ("serial", "gather", "append"):
+            results[mode] = await run_mode(mode, args.lookups, args.latency)
+        await db_pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TMDb lookup latency per stage")
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    for mode, stages in results.items():
+        line = ", ".join(
+            f"{stage} avg {data['avg_ms']:.1f} ms" for stage, data in stages.items()
+        )
+        print(f"{mode:>7}: {line}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
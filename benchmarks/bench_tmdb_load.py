@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+import tmdb  # noqa: E402
+from benchmarks.fake_tmdb import Corpus, Faults, create_app  # noqa: E402
+from db import init_db  # noqa: E402
+from db_pool import db_pool  # noqa: E402
+from http_client import close_http_session  # noqa: E402
+from tmdb_cache import tmdb_cache  # noqa: E402
+from utils import search_tmdb_film  # noqa: E402
+
+
+def percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+async def run_load(titles, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failed = 0
+
+    async def lookup(title):
+        nonlocal failed
+        async with semaphore:
+            started = time.perf_counter()
+            found, _, _ = await search_tmdb_film(title, "en")
+            latencies.append(time.perf_counter() - started)
+            if found is None:
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(lookup(title) for title in titles))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "lookups": len(titles),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "lookups_per_s": round(len(titles) / elapsed, 1),
+        "failed": failed,
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+    }
+
+
+async def main_async(args):
+    corpus = Corpus.load(synthetic=args.lookups, seed=args.seed)
+    # Синтетичні назви унікальні, тож кожен пошук доходить до сервера
+    titles = [movie["title"] for movie in corpus.popular][: args.lookups]
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    if args.client_rate:
+        # Без цього пропускна здатність упирається в TMDB_RATE_LIMIT з config.py
+        tmdb.tmdb_rate_limiter.rate = args.client_rate
+        tmdb.tmdb_rate_limiter.burst = args.client_rate
+    server = None
+    if args.base_url:
+        tmdb.TMDB_API_URL = args.base_url.rstrip("/")
+    else:
+        server = TestServer(create_app(corpus, faults))
+        await server.start_server()
+        tmdb.TMDB_API_URL = str(server.make_url("/3"))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_pool.path = os.path.join(tmp, "bench.db")
+        await init_db()
+        try:
+            for concurrency in args.concurrency:
+                tmdb_cache.clear_memory()
+                async with db_pool.writer() as db:
+                    await db.execute("DELETE FROM tmdb_cache")
+                    await db.commit()
+                before = (faults.requests, faults.errors, faults.rate_limited)
+                row = await run_load(titles, concurrency)
+                if server is not None:
+                    row["server_requests"] = faults.requests - before[0]
+                    row["server_errors"] = faults.errors - before[1]
+                    row["server_429s"] = faults.rate_limited - before[2]
+                results[str(concurrency)] = row
+        finally:
+            await close_http_session()
+            await db_pool.close()
+            if server is not None:
+                await server.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="TMDb lookup throughput against the local fake TMDb server"
+    )
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.1, help="seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--client-rate", type=float, help="override the client token bucket, req/s"
+    )
+    parser.add_argument(
+        "--base-url", help="use an already running fake_tmdb.py instead of in-process"
+    )
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    for concurrency, row in results.items():
+        print(
+            f"concurrency {concurrency:>4}: {row['lookups_per_s']:>8} lookups/s, "
+            f"p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms, failed {row['failed']}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
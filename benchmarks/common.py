@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+# Спільні для тестів і бенчмарків: синтетичні описи та замінники об'єктів aiogram
+WORDS = (
+    "love war space crew detective robber city family secret ship night "
+    "journey king queen ghost river mountain war doctor murder island "
+    "future robot dream village train prison heist revenge friendship"
+).split()
+
+
+class DummyMessage:
+    def __init__(self, text="", user_id=1, document=None):
+        self.text = text
+        self.document = document
+        self.from_user = SimpleNamespace(id=user_id, language_code="en")
+        self.answers = []
+        self.edits = []
+
+    @property
+    def texts(self):
+        return [args[0] for args, _ in self.answers]
+
+    async def answer(self, *args, **kwargs):
+        self.answers.append((args, kwargs))
+        # Хендлери редагують надіслане повідомлення через edit_text
+        return self
+
+    async def edit_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+class DummyState:
+    def __init__(self, data=None):
+        self.state = None
+        self.data = dict(data or {})
+
+    async def set_state(self, state=None):
+        self.state = state
+
+    async def get_state(self):
+        return self.state
+
+    async def update_data(self, **kwargs):
+        self.data.update(kwargs)
+        return self.data
+
+    async def get_data(self):
+        return dict(self.data)
+
+    async def clear(self):
+        self.state = None
+        self.data = {}
+
+
+class DummyInlineQuery:
+    def __init__(self, query, offset="", user_id=1):
+        self.query = query
+        self.offset = offset
+        self.from_user = SimpleNamespace(id=user_id, language_code="en")
+        self.answers = []
+
+    async def answer(self, results, **kwargs):
+        self.answers.append((results, kwargs))
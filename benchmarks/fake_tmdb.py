@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from aiohttp import web
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fixtures", "tmdb_movies.json"
+)
+PAGE_SIZE = 20
+WORDS = (
+    "midnight river empire shadow garden signal winter harbor secret machine "
+    "silver crown last island storm letter mirror hunter ghost city"
+).split()
+
+
+class Corpus:
+    def __init__(self, movies, genres):
+        self.movies = {movie["id"]: movie for movie in movies}
+        self.genres = genres
+        self._genre_names = {genre["id"]: genre["name"] for genre in genres}
+        self._popular = sorted(
+            self.movies.values(), key=lambda movie: movie["popularity"], reverse=True
+        )
+
+    @classmethod
+    def load(cls, path=FIXTURE, synthetic=0, seed=42):
+        with open(path, encoding="utf-8") as f:
+            fixture = json.load(f)
+        movies = list(fixture["movies"])
+        # Додаткові вигадані фільми, щоб пошук і discover мали об'єм
+        rnd = random.Random(seed)
+        genre_ids = [genre["id"] for genre in fixture["genres"]]
+        for i in range(synthetic):
+            movie_id = 10_000_000 + i
+            movies.append(
+                {
+                    "id": movie_id,
+                    "title": " ".join(rnd.sample(WORDS, k=3)).title() + f" {i}",
+                    "original_language": "en",
+                    "release_date": f"{rnd.randint(1950, 2024)}-01-01",
+                    "genre_ids": rnd.sample(genre_ids, k=2),
+                    "overview": " ".join(rnd.choices(WORDS, k=30)).capitalize() + ".",
+                    "vote_average": round(rnd.uniform(3, 9), 1),
+                    "popularity": round(rnd.uniform(0, 50), 2),
+                    "poster_path": f"/poster{movie_id}.jpg",
+                    "videos": [],
+                }
+            )
+        return cls(movies, fixture["genres"])
+
+    @staticmethod
+    def summary(movie):
+        return {key: value for key, value in movie.items() if key != "videos"}
+
+    def details(self, movie):
+        result = self.summary(movie)
+        result.pop("genre_ids", None)
+        result["genres"] = [
+            {"id": genre_id, "name": self._genre_names[genre_id]}
+            for genre_id in movie.get("genre_ids", [])
+        ]
+        return result
+
+    def search(self, query):
+        query = query.lower()
+        return [
+            movie
+            for movie in self._popular
+            if query in movie["title"].lower()
+            or query in movie.get("original_title", "").lower()
+        ]
+
+    @property
+    def popular(self):
+        return self._popular
+
+
+def paginate(items, page):
+    total_pages = max(1, (len(items) + PAGE_SIZE - 1) // PAGE_SIZE)
+    start = (page - 1) * PAGE_SIZE
+    return {
+        "page": page,
+        "results": [Corpus.summary(item) for item in items[start : start + PAGE_SIZE]],
+        "total_pages": total_pages,
+        "total_results": len(items),
+    }
+
+
+def not_found():
+    return web.json_response(
+        {
+            "success": False,
+            "status_code": 34,
+            "status_message": "The resource you requested could not be found.",
+        },
+        status=404,
+    )
+
+
+class Faults:
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        rate_limit_rate=0.0,
+        retry_after=1.0,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def delay(self):
+        return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+
+FAULTS = web.AppKey("faults", Faults)
+
+
+def create_app(corpus=None, faults=None, prefix="/3"):
+    corpus = corpus or Corpus.load()
+    faults = faults or Faults()
+
+    @web.middleware
+    async def inject_faults(request, handler):
+        faults.requests += 1
+        await asyncio.sleep(faults.delay())
+        roll = faults.random.random()
+        if roll < faults.rate_limit_rate:
+            faults.rate_limited += 1
+            return web.json_response(
+                {
+                    "success": False,
+                    "status_code": 25,
+                    "status_message": "Your request count is over the allowed limit.",
+                },
+                status=429,
+                headers={"Retry-After": str(faults.retry_after)},
+            )
+        if roll < faults.rate_limit_rate + faults.error_rate:
+            faults.errors += 1
+            return web.json_response(
+                {
+                    "success": False,
+                    "status_code": 11,
+                    "status_message": "Internal error.",
+                },
+                status=500,
+            )
+        return await handler(request)
+
+    def page_param(request):
+        try:
+            return max(1, int(request.query.get("page", 1)))
+        except ValueError:
+            return 1
+
+    async def search(request):
+        return web.json_response(
+            paginate(corpus.search(request.query.get("query", "")), page_param(request))
+        )
+
+    def movie_or_none(request):
+        try:
+            return corpus.movies.get(int(request.match_info["id"]))
+        except ValueError:
+            return None
+
+    async def details(request):
+        movie = movie_or_none(request)
+        if movie is None:
+            return not_found()
+        result = corpus.details(movie)
+        if "videos" in request.query.get("append_to_response", "").split(","):
+            result["videos"] = {"results": movie.get("videos", [])}
+        return web.json_response(result)
+
+    async def videos(request):
+        movie = movie_or_none(request)
+        if movie is None:
+            return not_found()
+        return web.json_response(
+            {"id": movie["id"], "results": movie.get("videos", [])}
+        )
+
+    async def discover(request):
+        # TMDb віддає щонайбільше 500 сторінок
+        return web.json_response(
+            paginate(corpus.popular, min(page_param(request), 500))
+        )
+
+    async def genres(request):
+        return web.json_response({"genres": corpus.genres})
+
+    app = web.Application(middlewares=[inject_faults])
+    app[FAULTS] = faults
+    app.router.add_get(f"{prefix}/search/movie", search)
+    app.router.add_get(f"{prefix}/movie/{{id}}", details)
+    app.router.add_get(f"{prefix}/movie/{{id}}/videos", videos)
+    app.router.add_get(f"{prefix}/discover/movie", discover)
+    app.router.add_get(f"{prefix}/genre/movie/list", genres)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the TMDb API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500s")
+    parser.add_argument(
+        "--rate-limit-rate", type=float, default=0.0, help="share of 429s"
+    )
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds")
+    parser.add_argument("--synthetic", type=int, default=1000, help="extra fake movies")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    app = create_app(Corpus.load(synthetic=args.synthetic), faults)
+    print(f'Set TMDB_BASE_URL = "http://{args.host}:{args.port}/3" in config.py')
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
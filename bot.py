@@ -1,35 +1,153 @@
-import asyncio
-import logging
-
-from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-
-from config import TOKEN
-from db import init_db
-from handlers import add, common, edit, inspect, remove
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-)
-
-dp = Dispatcher(storage=MemoryStorage())
-bot = Bot(token=TOKEN)
-
-
-def register_handlers():
-    dp.include_router(add.router)
-    dp.include_router(inspect.router)
-    dp.include_router(edit.router)
-    dp.include_router(remove.router)
-    dp.include_router(common.router)
-
-
-async def main():
-    register_handlers()
-    await init_db()
-    await dp.start_polling(bot)
-
-
-if __name__ == "__main__":
-    asyncio.run(main())
+import argparse
+import asyncio
+import logging
+import time
+
+from aiogram import Bot, Dispatcher
+
+from config import (
+    METRICS_HOST,
+    METRICS_PORT,
+    RUN_MODE,
+    STARTUP_WARMUP,
+    TOKEN,
+    WEBHOOK_HOST,
+    WEBHOOK_MAX_CONCURRENCY,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+)
+from db import init_db
+from db_pool import db_pool
+from handlers import add, common, edit, inline, inspect, remove, transfer
+from http_client import close_http_session, open_http_session
+from lang import load_detector
+from lazy import ensure_loaded
+from metrics import instrument, register_fsm_metrics, start_metrics_server
+from storage import SQLiteStorage
+from tmdb_cache import tmdb_cache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+)
+
+dp = Dispatcher(storage=SQLiteStorage())
+bot = Bot(token=TOKEN)
+
+
+ROUTERS = (
+    add.router,
+    inspect.router,
+    edit.router,
+    remove.router,
+    transfer.router,
+    inline.router,
+    common.router,
+)
+
+
+def register_handlers():
+    for router in ROUTERS:
+        dp.include_router(router)
+    instrument(dp, ROUTERS)
+    register_fsm_metrics(dp.storage)
+    dp.startup.register(on_startup)
+
+
+_background_tasks = set()
+
+
+def warm_up_detector():
+    started = time.perf_counter()
+    load_detector()
+    logging.info(f"Warmed up langdetect in {time.perf_counter() - started:.2f}s")
+
+
+def warm_up_numpy():
+    started = time.perf_counter()
+    ensure_loaded("numpy")
+    logging.info(f"Warmed up NumPy in {time.perf_counter() - started:.2f}s")
+
+
+async def on_startup():
+    if not STARTUP_WARMUP:
+        return
+    loop = asyncio.get_running_loop()
+    # Бот уже приймає оновлення, а профілі langdetect читаються в потоці
+    task = asyncio.ensure_future(loop.run_in_executor(None, warm_up_detector))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    # LazyLoader у Python 3.11 не потокобезпечний: хендлер у циклі подій міг би
+    # побачити напівзавантажений NumPy, тож імпорт завершується в самому циклі
+    loop.call_soon(warm_up_numpy)
+
+
+async def handle_update(data: dict):
+    await dp.feed_raw_update(bot, data)
+
+
+async def run_webhook():
+    # aiohttp.web потрібен лише в режимі webhook
+    from webhook import create_app, serve
+
+    app = create_app(
+        handle_update, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_MAX_CONCURRENCY
+    )
+    await dp.emit_startup(bot=bot)
+    try:
+        await bot.set_webhook(
+            WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=dp.resolve_used_update_types(),
+            # Telegram приймає від 1 до 100 паралельних з'єднань
+            max_connections=min(WEBHOOK_MAX_CONCURRENCY, 100),
+        )
+        await serve(app, WEBHOOK_HOST, WEBHOOK_PORT)
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+
+
+async def main():
+    register_handlers()
+    await db_pool.open()
+    await open_http_session()
+    metrics_runner = None
+    if METRICS_PORT:
+        metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+    try:
+        await init_db()
+        await tmdb_cache.purge_expired()
+        if RUN_MODE == "webhook":
+            await run_webhook()
+        else:
+            await dp.start_polling(bot)
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await close_http_session()
+        await db_pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Film collection Telegram bot")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report import and init times per module instead of starting the bot",
+    )
+    parser.add_argument("--json", help="with --profile-startup, write results here")
+    parser.add_argument(
+        "--db",
+        help="with --profile-startup, profile a copy of this DB (default: DB_PATH)",
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from startup_profile import run
+
+        asyncio.run(run(args.json, db_path=args.db))
+    else:
+        asyncio.run(main())
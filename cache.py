@@ -0,0 +1,206 @@
+import sys
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from config import (
+    COLLECTION_CACHE_MAX_BYTES,
+    COLLECTION_CACHE_MAX_USERS,
+    COLLECTION_CACHE_TTL,
+)
+
+
+def _freeze(info):
+    return MappingProxyType(dict(info))
+
+
+def _film_size(name, info):
+    return (
+        sys.getsizeof(name)
+        + sys.getsizeof(dict(info))
+        + sum(sys.getsizeof(value) for value in info.values())
+    )
+
+
+class _Entry:
+    __slots__ = ("films", "version", "expires_at", "size")
+
+    def __init__(self, films, version, expires_at):
+        self.films = films
+        self.version = version
+        self.expires_at = expires_at
+        self.size = sum(_film_size(name, info) for name, info in films.items())
+
+
+class CollectionCache:
+    def __init__(self, max_users: int, ttl: float, max_bytes: int):
+        self.max_users = max_users
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        # Версії лише для користувачів у кеші або з незавершеним завантаженням,
+        # тож словник не росте з кожним користувачем, що колись писав
+        self._versions = {}
+        self._loading = {}
+        self._clock = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, user_id: int):
+        return self._versions.get(user_id, 0)
+
+    def begin_load(self, user_id: int):
+        self._loading[user_id] = self._loading.get(user_id, 0) + 1
+        return self.version(user_id)
+
+    def end_load(self, user_id: int):
+        loading = self._loading.pop(user_id, 0) - 1
+        if loading > 0:
+            self._loading[user_id] = loading
+        self._forget(user_id)
+
+    def _forget(self, user_id: int):
+        if user_id not in self._entries and user_id not in self._loading:
+            self._versions.pop(user_id, None)
+
+    def _bump(self, user_id: int):
+        # Глобальний лічильник: версія не повторюється навіть після _forget
+        self._clock += 1
+        if user_id in self._entries or user_id in self._loading:
+            self._versions[user_id] = self._clock
+        return self._clock
+
+    def _drop(self, user_id: int):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self.size -= entry.size
+        self._forget(user_id)
+        return entry
+
+    def get(self, user_id: int):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic() or entry.version != self.version(
+            user_id
+        ):
+            self._drop(user_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        # Знімок лише для читання: записи замінюють entry.films новим словником,
+        # тож копіювати колекцію на кожне влучання не потрібно
+        return MappingProxyType(entry.films)
+
+    def cached_version(self, user_id: int):
+        # Версія актуальної копії колекції в кеші; None — копії немає
+        entry = self._entries.get(user_id)
+        if (
+            entry is None
+            or entry.expires_at <= time.monotonic()
+            or entry.version != self.version(user_id)
+        ):
+            return None
+        return entry.version
+
+    def put(self, user_id: int, films: dict, version: int):
+        # Якщо колекція змінилась під час завантаження — дані вже застаріли
+        if version != self.version(user_id):
+            return
+        self._drop(user_id)
+        films = {name: _freeze(info) for name, info in films.items()}
+        entry = _Entry(films, version, time.monotonic() + self.ttl)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[user_id] = entry
+        self._versions[user_id] = version
+        self.size += entry.size
+        self._evict()
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_users or self.size > self.max_bytes
+        ):
+            user_id, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+            self.evictions += 1
+            self._forget(user_id)
+
+    def update_film(self, user_id: int, name: str, info: dict):
+        version = self._bump(user_id)
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        old = entry.films.get(name)
+        delta = -_film_size(name, old) if old is not None else 0
+        entry.films = {**entry.films, name: _freeze(info)}
+        delta += _film_size(name, entry.films[name])
+        entry.size += delta
+        self.size += delta
+        entry.version = version
+        self._evict()
+
+    def update_fields(self, user_id: int, name: str, changes: dict):
+        entry = self._entries.get(user_id)
+        info = entry.films.get(name) if entry is not None else None
+        if info is None:
+            # Фільму немає в кеші — кеш колекції вже не відповідає базі
+            self.invalidate(user_id)
+            return
+        self.update_film(user_id, name, {**info, **changes})
+
+    def rename_film(self, user_id: int, name: str, new_name: str):
+        entry = self._entries.get(user_id)
+        info = entry.films.get(name) if entry is not None else None
+        if info is None:
+            self.invalidate(user_id)
+            return
+        self.remove_film(user_id, name)
+        self.update_film(user_id, new_name, info)
+
+    def remove_film(self, user_id: int, name: str):
+        version = self._bump(user_id)
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        old = entry.films.get(name)
+        if old is not None:
+            entry.films = {
+                key: value for key, value in entry.films.items() if key != name
+            }
+            removed = _film_size(name, old)
+            entry.size -= removed
+            self.size -= removed
+        entry.version = version
+
+    def invalidate(self, user_id: int):
+        self._bump(user_id)
+        self._drop(user_id)
+
+    def clear(self):
+        self._entries.clear()
+        self._versions.clear()
+        self._loading.clear()
+        self.size = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "users": len(self._entries),
+            "bytes": self.size,
+        }
+
+
+collection_cache = CollectionCache(
+    max_users=COLLECTION_CACHE_MAX_USERS,
+    ttl=COLLECTION_CACHE_TTL,
+    max_bytes=COLLECTION_CACHE_MAX_BYTES,
+)
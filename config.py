@@ -1,6 +1,75 @@
-TOKEN = "YOUR TOKEN"  # from BotFather
-API_KEY = "YOUR API KEY"  # from https://www.themoviedb.org/settings/api
-DB_PATH = "films.db"
-MAX_GENRE_LEN = 50
-MAX_DESC_LEN = 500
-MAX_LEN = 200
+TOKEN = "YOUR TOKEN"  # from BotFather
+API_KEY = "YOUR API KEY"  # from https://www.themoviedb.org/settings/api
+TMDB_BASE_URL = "https://api.themoviedb.org/3"  # або адреса benchmarks/fake_tmdb.py
+DB_PATH = "films.db"
+MAX_GENRE_LEN = 50
+MAX_DESC_LEN = 500
+MAX_LEN = 200
+DB_READERS = 4
+DB_WRITERS = 1
+DB_CACHE_SIZE_KB = 16384
+DB_MMAP_SIZE = 64 * 1024 * 1024
+DB_CACHED_STATEMENTS = 256
+COLLECTION_CACHE_MAX_USERS = 1000
+COLLECTION_CACHE_TTL = 300  # секунд
+COLLECTION_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FTS_MAX_TERMS = 32  # скільки слів запиту враховувати в повнотекстовому пошуку
+FTS_MIN_SIMILARITY = 0.3  # мінімальна частка слів запиту, знайдених у фільмі
+FTS_CANDIDATES = 4  # скільки кандидатів BM25 на один результат перевіряти
+TFIDF_NGRAM = 3
+TFIDF_MAX_USERS = 200
+FUZZY_MAX_USERS = 1000  # триграмних індексів назв у пам'яті
+FUZZY_SUGGESTIONS = 5  # скільки схожих назв пропонувати
+FUZZY_MIN_SCORE = 0.3  # поріг схожості (коефіцієнт Дайса за триграмами)
+INLINE_PAGE_SIZE = 20  # результатів на сторінку inline-режиму (Telegram: до 50)
+INLINE_CACHE_TIME = 10  # секунд, скільки Telegram кешує відповідь
+DESCRIPTION_SEARCH_ENGINE = "fts"  # fts, tfidf або difflib
+TMDB_CACHE_MEMORY_SIZE = 1024  # відповідей TMDb у пам'яті
+TMDB_CACHE_TTL = {  # секунд, для кожного endpoint
+    "/search/movie": 6 * 3600,
+    "/movie/{id}": 24 * 3600,
+    "/movie/{id}/videos": 24 * 3600,
+    "/discover/movie": 3600,
+    "/genre/movie/list": 7 * 24 * 3600,
+}
+TMDB_CACHE_DEFAULT_TTL = 3600
+TMDB_NEGATIVE_TTL = 600  # скільки пам'ятати "не знайдено"
+HTTP_LIMIT = 100  # одночасних HTTP з'єднань
+HTTP_LIMIT_PER_HOST = 20
+HTTP_DNS_CACHE_TTL = 300  # секунд
+HTTP_KEEPALIVE_TIMEOUT = 60  # секунд
+HTTP_TIMEOUT = 15  # секунд на весь запит
+HTTP_CONNECT_TIMEOUT = 5
+TMDB_APPEND_TO_RESPONSE = True  # деталі й відео фільму одним запитом
+TMDB_RATE_LIMIT = 40  # запитів до TMDb за секунду
+TMDB_RATE_BURST = 20
+TMDB_MAX_RETRIES = 3  # повторів після відповіді 429
+TMDB_RETRY_BACKOFF = 0.5  # секунд, подвоюється з кожною спробою
+TMDB_RETRY_MAX_DELAY = 10
+PAGE_FETCH_SIZE = 20  # скільки фільмів читати з бази на одну сторінку
+FSM_STATE_TTL = 24 * 3600  # секунд, після яких незавершений діалог скидається
+FSM_FLUSH_INTERVAL = 1.0  # секунд між записами станів у базу
+FSM_FLUSH_BATCH = 200  # записати раніше, якщо змінилось стільки станів
+FSM_MEMORY_SIZE = 10000  # станів у пам'яті
+FSM_RECHECK_INTERVAL = 1.0  # секунд, після яких стан у пам'яті звіряється з базою
+RUN_MODE = "polling"  # polling або webhook
+WEBHOOK_URL = ""  # публічна адреса бота, наприклад https://example.com
+WEBHOOK_HOST = "0.0.0.0"
+WEBHOOK_PORT = 8080
+WEBHOOK_PATH = "/webhook"
+WEBHOOK_SECRET = ""  # перевіряється в заголовку X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_MAX_CONCURRENCY = 100  # апдейтів, що обробляються одночасно
+WORKER_PROCESSES = 4  # процесів-обробників для supervisor.py
+WORKER_SHUTDOWN_TIMEOUT = 10  # секунд на завершення воркера
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9100  # 0 вимикає /metrics; воркери supervisor.py беруть наступні порти
+METRICS_LOOP_LAG_INTERVAL = 0.5  # секунд між вимірами затримки event loop
+LANG_CACHE_SIZE = 4096  # запитів, для яких запам'ятовується визначена мова
+LANG_DETECT_SEED = 0  # langdetect без seed дає різні відповіді на той самий текст
+STARTUP_WARMUP = True  # довантажувати langdetect і NumPy одразу після старту
+IMPORT_CHUNK_SIZE = 500  # фільмів в одній транзакції при /import
+IMPORT_MAX_FILE_SIZE = 20 * 1024 * 1024  # Bot API не віддає ботам більші файли
+EXPORT_BATCH_SIZE = 500  # фільмів, що читаються з бази за раз при /export
+TMDB_BATCH_CONCURRENCY = 5  # одночасних пошуків у пакетному додаванні
+TMDB_BATCH_MAX_TITLES = 50  # назв в одному пакеті
+TMDB_BATCH_PROGRESS_INTERVAL = 1.0  # секунд між оновленнями повідомлення з прогресом
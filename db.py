@@ -1,108 +1,780 @@
-import logging
-
-import aiosqlite
-
-from config import DB_PATH
-
-logger = logging.getLogger(__name__)
-
-
-async def init_db():
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS films (
-                user_id INTEGER,
-                name TEXT,
-                rating REAL,
-                year INTEGER,
-                genre TEXT,
-                description TEXT,
-                tag TEXT,
-                review TEXT,
-                poster_url TEXT,
-                trailer TEXT,
-                PRIMARY KEY (user_id, name)
-            )
-        """
-        )
-        await db.commit()
-
-
-async def load_films(user_id: int):
-    try:
-        # Відкриваємо підключення до бази даних
-        async with aiosqlite.connect(DB_PATH) as db:
-            # Вибираємо всі фільми для поточного користувача
-            cursor = await db.execute(
-                "SELECT name, rating, year, genre, description, tag, review, poster_url, trailer FROM films WHERE user_id = ?",
-                (user_id,),
-            )
-            rows = await cursor.fetchall()
-            films = {}
-            for row in rows:
-                # Формуємо словник фільмів
-                (
-                    name,
-                    rating,
-                    year,
-                    genre,
-                    description,
-                    tag,
-                    review,
-                    poster_url,
-                    trailer,
-                ) = row
-                films[name] = {
-                    "rating": rating,
-                    "year": year,
-                    "genre": genre,
-                    "description": description,
-                    "tag": tag,
-                    "review": review,
-                    "poster_url": poster_url,
-                    "trailer": trailer,
-                }
-            return films
-    except Exception as e:
-        logger.error(f"Error loading films for user {user_id}: {e}")
-        return {}
-
-
-async def save_film(user_id: int, film_data: dict):
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                """
-                INSERT INTO films (user_id, name, rating, year, genre, description, tag, review, poster_url, trailer)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(user_id, name) DO UPDATE SET
-                    rating=excluded.rating,
-                    year=excluded.year,
-                    genre=excluded.genre,
-                    description=excluded.description,
-                    tag=excluded.tag,
-                    review=excluded.review,
-                    poster_url=excluded.poster_url,
-                    trailer=excluded.trailer
-                """,
-                (
-                    user_id,
-                    film_data.get("name"),
-                    film_data.get("rating"),
-                    film_data.get("year"),
-                    film_data.get("genre"),
-                    film_data.get("description"),
-                    film_data.get("tag"),
-                    film_data.get("review"),
-                    film_data.get("poster_url"),
-                    film_data.get("trailer"),
-                ),
-            )
-            await db.commit()
-            return True
-    except Exception as e:
-        logger.error(
-            f"Error saving film '{film_data.get('name')}' for user {user_id}: {e}"
-        )
-        return False
+import logging
+import re
+import sqlite3
+import unicodedata
+from itertools import islice
+
+from cache import collection_cache
+from config import (
+    EXPORT_BATCH_SIZE,
+    FTS_CANDIDATES,
+    FTS_MAX_TERMS,
+    FTS_MIN_SIMILARITY,
+    FUZZY_SUGGESTIONS,
+    IMPORT_CHUNK_SIZE,
+)
+from db_pool import db_pool
+from fuzzy import NameIndex, name_indexes
+from metrics import timed_query
+from migrations import migrate
+from similarity import tfidf_indexes
+
+logger = logging.getLogger(__name__)
+
+FILM_FIELDS = (
+    "rating",
+    "year",
+    "genre",
+    "description",
+    "tag",
+    "review",
+    "poster_url",
+    "trailer",
+)
+
+
+# Поля користувача лежать у films, решта — у спільному каталозі movies
+FILM_COLUMNS = (
+    "f.name, f.rating, m.year, m.genre, m.description, t.name, f.review, "
+    "m.poster_url, m.trailer"
+)
+FILM_TABLES = (
+    "films f JOIN movies m ON m.id = f.movie_id LEFT JOIN tags t ON t.id = f.tag_id"
+)
+SELECT_FILMS = f"SELECT {FILM_COLUMNS} FROM {FILM_TABLES}"
+CATALOG_FIELDS = ("year", "genre", "description", "poster_url", "trailer")
+
+
+def normalize_genre(genre):
+    # SQLite lower() працює лише з ASCII, тому нормалізуємо в Python
+    return str(genre).strip().lower() if genre is not None else None
+
+
+def split_genres(genre):
+    names = {}
+    for part in str(genre or "").split(","):
+        part = part.strip()
+        if part:
+            names.setdefault(normalize_genre(part), part)
+    return list(names.items())
+
+
+def _row_to_film(row):
+    name, *values = row
+    return name, dict(zip(FILM_FIELDS, values))
+
+
+async def init_db():
+    async with db_pool.writer() as db:
+        await migrate(db)
+
+
+@timed_query
+async def load_films(user_id: int):
+    cached = collection_cache.get(user_id)
+    if cached is not None:
+        return cached
+    version = collection_cache.begin_load(user_id)
+    try:
+        # Беремо підключення з пулу
+        async with db_pool.reader() as db:
+            # Вибираємо всі фільми для поточного користувача
+            async with db.execute(
+                f"{SELECT_FILMS} WHERE f.user_id = ?", (user_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        # Формуємо словник фільмів
+        films = dict(_row_to_film(row) for row in rows)
+        collection_cache.put(user_id, films, version)
+        return films
+    except Exception as e:
+        logger.error(f"Error loading films for user {user_id}: {e}")
+        return {}
+    finally:
+        collection_cache.end_load(user_id)
+
+
+@timed_query
+async def _select_films(user_id: int, where: str, params: tuple):
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                f"{SELECT_FILMS} WHERE f.user_id = ? AND {where} "
+                "ORDER BY f.rating DESC, f.name",
+                (user_id, *params),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        return [_row_to_film(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error querying films for user {user_id}: {e}")
+        return []
+
+
+# Фільтри для вибірок і сторінок: SQL-умова та нормалізація значення
+FILM_FILTERS = {
+    "all": ("1", None),
+    "rating": ("f.rating = ?", float),
+    "year": ("m.year = ?", int),
+    # Жанри фільму — кілька рядків movie_genres, шукаємо серед них
+    "genre": (
+        "EXISTS (SELECT 1 FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id "
+        "WHERE mg.movie_id = f.movie_id AND instr(g.name_norm, ?) > 0)",
+        normalize_genre,
+    ),
+    "tag": ("f.tag_id = (SELECT id FROM tags WHERE name = ?)", str.strip),
+}
+
+
+def _filter_sql(kind: str, value):
+    # ValueError — невідомий фільтр або значення, яке не приводиться до типу
+    if kind not in FILM_FILTERS:
+        raise ValueError(f"Unknown film filter: {kind}")
+    where, convert = FILM_FILTERS[kind]
+    return where, (convert(value),) if convert else ()
+
+
+async def films_by_rating(user_id: int, rating: float):
+    return await _select_films(user_id, *_filter_sql("rating", rating))
+
+
+async def films_by_year(user_id: int, year: int):
+    return await _select_films(user_id, *_filter_sql("year", year))
+
+
+async def films_by_genre(user_id: int, genre: str):
+    return await _select_films(user_id, *_filter_sql("genre", genre))
+
+
+async def films_by_tag(user_id: int, tag: str):
+    return await _select_films(user_id, *_filter_sql("tag", tag))
+
+
+@timed_query
+async def films_page(
+    user_id: int, kind: str, value, cursor=None, direction="next", limit=20
+):
+    return await _films_page(user_id, kind, value, cursor, direction, limit)
+
+
+async def _films_page(user_id: int, kind: str, value, cursor, direction, limit):
+    # Keyset-пагінація за (rating DESC, name): cursor — rowid крайнього фільму
+    where, params = _filter_sql(kind, value)
+    try:
+        async with db_pool.reader() as db:
+            boundary = None
+            if cursor is not None:
+                async with db.execute(
+                    "SELECT rating, name FROM films WHERE rowid = ? AND user_id = ?",
+                    (cursor, user_id),
+                ) as c:
+                    boundary = await c.fetchone()
+            sql = (
+                f"SELECT f.rowid, {FILM_COLUMNS} FROM {FILM_TABLES} "
+                f"WHERE f.user_id = ? AND {where}"
+            )
+            args = [user_id, *params]
+            backwards = boundary is not None and direction == "prev"
+            if boundary is None:
+                sql += " ORDER BY f.rating DESC, f.name"
+            elif backwards:
+                sql += (
+                    " AND (f.rating > ? OR (f.rating = ? AND f.name < ?))"
+                    " ORDER BY f.rating, f.name DESC"
+                )
+                args += [boundary[0], boundary[0], boundary[1]]
+            else:
+                sql += (
+                    " AND (f.rating < ? OR (f.rating = ? AND f.name > ?))"
+                    " ORDER BY f.rating DESC, f.name"
+                )
+                args += [boundary[0], boundary[0], boundary[1]]
+            async with db.execute(f"{sql} LIMIT ?", (*args, limit)) as c:
+                rows = await c.fetchall()
+    except Exception as e:
+        logger.error(f"Error loading films page for user {user_id}: {e}")
+        return [], False
+    # Для "prev" рядки йдуть від найближчого до курсора
+    return [(row[0], *_row_to_film(row[1:])) for row in rows], backwards
+
+
+@timed_query
+async def has_films_beyond(user_id: int, kind: str, value, cursor, direction):
+    # Необроблена версія, щоб запит не рахувався в метриках двічі
+    rows, _ = await _films_page(user_id, kind, value, cursor, direction, limit=1)
+    return bool(rows)
+
+
+# Службові слова є майже в кожному описі, тож лише підмішують випадкові фільми
+FTS_STOP_WORDS = frozenset("""
+    and are but for from had has have her his into its not off one our out she
+    that the their them then there these they this was were what when which who
+    whom why will with you your
+    але або від для його коли між над під про так там тих цей щоб які
+    его или как когда между под тот это что чтобы эти
+    """.split())
+FTS_MIN_WORD_LEN = 3  # коротші слова відкидаються
+FTS_PREFIX_MIN_LEN = 4  # коротші слова шукаються точно, а не як префікс
+
+
+def _fold(word: str):
+    # Як unicode61 remove_diacritics: регістр і наголоси не важать
+    word = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(char for char in word if not unicodedata.combining(char))
+
+
+def _fts_terms(text: str):
+    terms = {}
+    for word in re.findall(r"\w+", str(text or "").casefold()):
+        if len(word) >= FTS_MIN_WORD_LEN and word not in FTS_STOP_WORDS:
+            terms.setdefault(word, _fold(word))
+    return list(terms.items())[:FTS_MAX_TERMS]
+
+
+def _fts_query(user_id: int, terms):
+    if not terms:
+        return None
+    match = " OR ".join(
+        f'"{word}"*' if len(word) >= FTS_PREFIX_MIN_LEN else f'"{word}"'
+        for word, _ in terms
+    )
+    return f'owner : "u{user_id}" AND {{name description genre}} : ({match})'
+
+
+def _term_coverage(terms, name: str, info: dict):
+    # Частка слів запиту, знайдених у фільмі: 1.0 — збіглися всі
+    words = {
+        _fold(word)
+        for text in (name, info.get("description"), info.get("genre"))
+        for word in re.findall(r"\w+", str(text or ""))
+    }
+    found = sum(
+        1
+        for word, folded in terms
+        if (
+            any(candidate.startswith(folded) for candidate in words)
+            if len(word) >= FTS_PREFIX_MIN_LEN
+            else folded in words
+        )
+    )
+    return found / len(terms)
+
+
+@timed_query
+async def search_films_by_description(
+    user_id: int, text: str, top_n=5, threshold=FTS_MIN_SIMILARITY
+):
+    terms = _fts_terms(text)
+    query = _fts_query(user_id, terms)
+    if query is None:
+        return []
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                f"""
+                SELECT {FILM_COLUMNS}
+                FROM films_fts
+                JOIN films f ON f.rowid = films_fts.rowid
+                JOIN movies m ON m.id = f.movie_id
+                LEFT JOIN tags t ON t.id = f.tag_id
+                WHERE films_fts MATCH ? AND f.user_id = ?
+                ORDER BY bm25(films_fts, 0.0, 0.5, 1.0, 0.5)
+                LIMIT ?
+                """,
+                (query, user_id, top_n * FTS_CANDIDATES),
+            ) as cursor:
+                rows = await cursor.fetchall()
+    except Exception as e:
+        logger.error(f"Error searching films for user {user_id}: {e}")
+        return []
+    # BM25 лише відбирає кандидатів: його значення залежить від усієї таблиці
+    # і не є схожістю, тож відсоток — це частка слів запиту, що знайшлися
+    matched = []
+    for row in rows:
+        name, info = _row_to_film(row)
+        similarity = _term_coverage(terms, name, info)
+        if similarity >= threshold:
+            matched.append((similarity, name, info))
+    # Стабільне сортування: за рівної частки лишається порядок BM25
+    matched.sort(key=lambda item: item[0], reverse=True)
+    return matched[:top_n]
+
+
+@timed_query
+async def has_films(user_id: int):
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT 1 FROM films WHERE user_id = ? LIMIT 1", (user_id,)
+            ) as cursor:
+                return await cursor.fetchone() is not None
+    except Exception as e:
+        logger.error(f"Error checking films for user {user_id}: {e}")
+        return False
+
+
+@timed_query
+async def film_exists(user_id: int, name: str):
+    # Пошук по первинному ключу (user_id, name) без завантаження колекції
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT 1 FROM films WHERE user_id = ? AND name = ?", (user_id, name)
+            ) as cursor:
+                return await cursor.fetchone() is not None
+    except Exception as e:
+        logger.error(f"Error checking film '{name}' for user {user_id}: {e}")
+        return False
+
+
+@timed_query
+async def get_film(user_id: int, name: str):
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                f"{SELECT_FILMS} WHERE f.user_id = ? AND f.name = ?", (user_id, name)
+            ) as cursor:
+                row = await cursor.fetchone()
+    except Exception as e:
+        logger.error(f"Error loading film '{name}' for user {user_id}: {e}")
+        return None
+    return _row_to_film(row)[1] if row else None
+
+
+async def _name_index(user_id: int):
+    index = name_indexes.get(user_id)
+    if index is not None:
+        return index
+    # Та сама перевірка версії, що й у load_films: поки індексу немає,
+    # name_indexes.add/remove нічого не роблять, і запис під час читання
+    # назв інакше загубився б в індексі до його витіснення
+    version = collection_cache.begin_load(user_id)
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT name FROM films WHERE user_id = ?", (user_id,)
+            ) as cursor:
+                names = [name for (name,) in await cursor.fetchall()]
+        if version != collection_cache.version(user_id):
+            # Колекція змінилась під час читання: відповідаємо цим індексом,
+            # але не кешуємо його
+            return NameIndex(names)
+        return name_indexes.build(user_id, names)
+    except Exception as e:
+        logger.error(f"Error loading film names for user {user_id}: {e}")
+        return None
+    finally:
+        collection_cache.end_load(user_id)
+
+
+@timed_query
+async def suggest_film_names(user_id: int, text: str, limit=FUZZY_SUGGESTIONS):
+    # Найближчі за триграмами назви з колекції — без звернення до TMDb
+    index = await _name_index(user_id)
+    if index is None:
+        return []
+    return [name for name, _ in index.search(text, limit)]
+
+
+@timed_query
+async def rank_film_names(user_id: int, text: str):
+    index = await _name_index(user_id)
+    return index.rank(text) if index is not None else []
+
+
+@timed_query
+async def films_by_names(user_id: int, names):
+    # Лише фільми однієї сторінки за первинним ключем, у порядку names
+    names = list(names)
+    if not names:
+        return []
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                f"{SELECT_FILMS} WHERE f.user_id = ? "
+                f"AND f.name IN ({', '.join('?' * len(names))})",
+                (user_id, *names),
+            ) as cursor:
+                films = dict(_row_to_film(row) for row in await cursor.fetchall())
+    except Exception as e:
+        logger.error(f"Error loading films for user {user_id}: {e}")
+        return []
+    return [(name, films[name]) for name in names if name in films]
+
+
+@timed_query
+async def existing_film_names(user_id: int, names):
+    names = list(names)
+    if not names:
+        return set()
+    try:
+        async with db_pool.reader() as db:
+            async with db.execute(
+                "SELECT name FROM films WHERE user_id = ? "
+                f"AND name IN ({', '.join('?' * len(names))})",
+                (user_id, *names),
+            ) as cursor:
+                return {name for (name,) in await cursor.fetchall()}
+    except Exception as e:
+        logger.error(f"Error checking films for user {user_id}: {e}")
+        return set()
+
+
+UPSERT_FILM = """
+    INSERT INTO films (user_id, name, movie_id, rating, tag_id, review)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, name) DO UPDATE SET
+        movie_id=excluded.movie_id,
+        rating=excluded.rating,
+        tag_id=excluded.tag_id,
+        review=excluded.review
+"""
+INSERT_MOVIE = """
+    INSERT INTO movies (tmdb_id, title, year, genre, description, poster_url, trailer, vote_average)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# IS замість =, бо поля бувають NULL; рік порівнюється з урахуванням affinity колонки
+SAME_CATALOG = "SELECT 1 FROM movies WHERE id = ? AND " + " AND ".join(
+    f"{field} IS ?" for field in CATALOG_FIELDS
+)
+
+
+class _Lookups:
+    # id жанрів і тегів у межах однієї транзакції запису; зв'язки фільм-жанр
+    # накопичуються й пишуться одним executemany
+    def __init__(self):
+        self.genres = {}
+        self.tags = {}
+        self.links = []
+
+
+async def _set_genres(db, movie_id: int, genre, lookups: _Lookups):
+    for position, (norm, name) in enumerate(split_genres(genre)):
+        if norm not in lookups.genres:
+            await db.execute(
+                "INSERT OR IGNORE INTO genres (name, name_norm) VALUES (?, ?)",
+                (name, norm),
+            )
+            async with db.execute(
+                "SELECT id FROM genres WHERE name_norm = ?", (norm,)
+            ) as cursor:
+                (lookups.genres[norm],) = await cursor.fetchone()
+        lookups.links.append((movie_id, position, lookups.genres[norm]))
+
+
+async def _tag(db, tag, lookups: _Lookups):
+    tag = str(tag).strip() if tag is not None else ""
+    if not tag:
+        return None, None
+    key = tag.lower()
+    if key not in lookups.tags:
+        await db.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag,))
+        async with db.execute(
+            "SELECT id, name FROM tags WHERE name = ?", (tag,)
+        ) as cursor:
+            lookups.tags[key] = tuple(await cursor.fetchone())
+    return lookups.tags[key]
+
+
+async def _same_catalog(db, movie_id: int, catalog: tuple):
+    async with db.execute(SAME_CATALOG, (movie_id, *catalog)) as cursor:
+        return await cursor.fetchone() is not None
+
+
+async def _insert_movie(db, film_data: dict, catalog: tuple, lookups: _Lookups):
+    cursor = await db.execute(
+        INSERT_MOVIE, (None, film_data.get("name"), *catalog, None)
+    )
+    await _set_genres(db, cursor.lastrowid, film_data.get("genre"), lookups)
+    return cursor.lastrowid
+
+
+async def _shared_movie(db, tmdb_id: int, film_data: dict, catalog, lookups):
+    # Рядок каталогу з tmdb_id не змінюється після вставки: ним користуються
+    # інші користувачі, а FTS-індекс їхніх фільмів посилається на його текст
+    cursor = await db.execute(
+        INSERT_MOVIE.rstrip() + " ON CONFLICT(tmdb_id) DO NOTHING",
+        (tmdb_id, film_data.get("name"), *catalog, film_data.get("rating")),
+    )
+    if cursor.rowcount:
+        await _set_genres(db, cursor.lastrowid, film_data.get("genre"), lookups)
+        return cursor.lastrowid
+    async with db.execute(
+        "SELECT id FROM movies WHERE tmdb_id = ?", (tmdb_id,)
+    ) as cursor:
+        (movie_id,) = await cursor.fetchone()
+    return movie_id
+
+
+async def _resolve_movie(db, film_data: dict, existing, lookups: _Lookups):
+    catalog = tuple(film_data.get(field) for field in CATALOG_FIELDS)
+    tmdb_id = film_data.get("tmdb_id")
+    if tmdb_id is not None:
+        movie_id = await _shared_movie(db, tmdb_id, film_data, catalog, lookups)
+        if await _same_catalog(db, movie_id, catalog):
+            return movie_id
+    if existing is not None:
+        movie_id, existing_tmdb_id = existing
+        if await _same_catalog(db, movie_id, catalog):
+            return movie_id
+        if existing_tmdb_id is None:
+            # Власний рядок каталогу фільму можна змінити на місці
+            await db.execute(
+                "UPDATE movies SET title = ?, "
+                + ", ".join(f"{field} = ?" for field in CATALOG_FIELDS)
+                + " WHERE id = ?",
+                (film_data.get("name"), *catalog, movie_id),
+            )
+            await db.execute("DELETE FROM movie_genres WHERE movie_id = ?", (movie_id,))
+            # Той самий фільм міг уже змінитися раніше в цій же порції
+            lookups.links = [link for link in lookups.links if link[0] != movie_id]
+            await _set_genres(db, movie_id, film_data.get("genre"), lookups)
+            return movie_id
+    # Користувач змінив дані спільного фільму — копія лише для нього
+    return await _insert_movie(db, film_data, catalog, lookups)
+
+
+async def _write_films(db, user_id: int, films: list):
+    names = [film.get("name") for film in films]
+    async with db.execute(
+        "SELECT f.name, f.movie_id, m.tmdb_id FROM films f "
+        "JOIN movies m ON m.id = f.movie_id "
+        f"WHERE f.user_id = ? AND f.name IN ({', '.join('?' * len(names))})",
+        (user_id, *names),
+    ) as cursor:
+        existing = {
+            name: (movie_id, tmdb_id) async for name, movie_id, tmdb_id in cursor
+        }
+    lookups = _Lookups()
+    rows = []
+    saved = []
+    for film in films:
+        movie_id = await _resolve_movie(
+            db, film, existing.get(film.get("name")), lookups
+        )
+        tag_id, tag = await _tag(db, film.get("tag"), lookups)
+        rows.append(
+            (
+                user_id,
+                film.get("name"),
+                movie_id,
+                film.get("rating"),
+                tag_id,
+                film.get("review"),
+            )
+        )
+        saved.append((film.get("name"), {**_film_info(film), "tag": tag}))
+    await db.executemany(
+        "INSERT INTO movie_genres (movie_id, position, genre_id) VALUES (?, ?, ?)",
+        lookups.links,
+    )
+    await db.executemany(UPSERT_FILM, rows)
+    return saved
+
+
+def _film_info(film_data: dict):
+    return {key: film_data.get(key) for key in FILM_FIELDS}
+
+
+@timed_query
+async def save_film(user_id: int, film_data: dict):
+    try:
+        async with db_pool.writer() as db:
+            [(name, info)] = await _write_films(db, user_id, [film_data])
+            await db.commit()
+        collection_cache.update_film(user_id, name, info)
+        tfidf_indexes.update(
+            user_id, name, info["description"], collection_cache.version(user_id)
+        )
+        name_indexes.add(user_id, name)
+        return True
+    except Exception as e:
+        collection_cache.invalidate(user_id)
+        tfidf_indexes.drop(user_id)
+        name_indexes.drop(user_id)
+        logger.error(
+            f"Error saving film '{film_data.get('name')}' for user {user_id}: {e}"
+        )
+        return False
+
+
+@timed_query
+async def save_films_bulk(user_id: int, films, chunk_size=IMPORT_CHUNK_SIZE):
+    # films може бути генератором: читаємо його порціями, кожна — окрема транзакція,
+    # щоб великий імпорт не тримав writer-з'єднання весь час
+    saved = 0
+    films = iter(films)
+    try:
+        while chunk := list(islice(films, chunk_size)):
+            async with db_pool.writer() as db:
+                await _write_films(db, user_id, chunk)
+                await db.commit()
+            saved += len(chunk)
+    except Exception as e:
+        logger.error(f"Error importing films for user {user_id}: {e}")
+    finally:
+        # Після масового запису простіше перебудувати кеш та індекс з нуля
+        if saved:
+            collection_cache.invalidate(user_id)
+            tfidf_indexes.drop(user_id)
+            name_indexes.drop(user_id)
+    return saved
+
+
+async def _own_movie(db, user_id: int, name: str):
+    # id рядка каталогу, який належить лише цьому фільму; спільний рядок
+    # спершу копіюється, щоб правка не зачепила інших користувачів
+    async with db.execute(
+        "SELECT f.movie_id, m.tmdb_id FROM films f JOIN movies m ON m.id = f.movie_id "
+        "WHERE f.user_id = ? AND f.name = ?",
+        (user_id, name),
+    ) as cursor:
+        row = await cursor.fetchone()
+    if row is None:
+        return None
+    movie_id, tmdb_id = row
+    if tmdb_id is None:
+        return movie_id
+    cursor = await db.execute(
+        "INSERT INTO movies (title, year, genre, description, poster_url, trailer) "
+        "SELECT title, year, genre, description, poster_url, trailer "
+        "FROM movies WHERE id = ?",
+        (movie_id,),
+    )
+    own_id = cursor.lastrowid
+    await db.execute(
+        "INSERT INTO movie_genres (movie_id, position, genre_id) "
+        "SELECT ?, position, genre_id FROM movie_genres WHERE movie_id = ?",
+        (own_id, movie_id),
+    )
+    await db.execute(
+        "UPDATE films SET movie_id = ? WHERE user_id = ? AND name = ?",
+        (own_id, user_id, name),
+    )
+    return own_id
+
+
+async def _update_field(db, user_id: int, name: str, field: str, value):
+    # Разом з ознакою успіху повертає значення в тому вигляді, як воно лягло в базу
+    if field in ("rating", "review", "tag"):
+        column, column_value = field, value
+        if field == "tag":
+            column = "tag_id"
+            column_value, value = await _tag(db, value, _Lookups())
+        cursor = await db.execute(
+            f"UPDATE films SET {column} = ? WHERE user_id = ? AND name = ?",
+            (column_value, user_id, name),
+        )
+        return cursor.rowcount == 1, value
+    movie_id = await _own_movie(db, user_id, name)
+    if movie_id is None:
+        return False, value
+    await db.execute(f"UPDATE movies SET {field} = ? WHERE id = ?", (value, movie_id))
+    if field == "genre":
+        lookups = _Lookups()
+        await db.execute("DELETE FROM movie_genres WHERE movie_id = ?", (movie_id,))
+        await _set_genres(db, movie_id, value, lookups)
+        await db.executemany(
+            "INSERT INTO movie_genres (movie_id, position, genre_id) VALUES (?, ?, ?)",
+            lookups.links,
+        )
+    return True, value
+
+
+@timed_query
+async def update_film_field(user_id: int, name: str, field: str, value):
+    if field not in FILM_FIELDS:
+        raise ValueError(f"Unknown film field: {field}")
+    try:
+        async with db_pool.writer() as db:
+            updated, value = await _update_field(db, user_id, name, field, value)
+            if updated:
+                await db.commit()
+    except Exception as e:
+        collection_cache.invalidate(user_id)
+        tfidf_indexes.drop(user_id)
+        logger.error(f"Error updating {field} of '{name}' for user {user_id}: {e}")
+        return False
+    if updated:
+        collection_cache.update_fields(user_id, name, {field: value})
+        if field == "description":
+            tfidf_indexes.update(
+                user_id, name, value, collection_cache.version(user_id)
+            )
+        else:
+            tfidf_indexes.keep(user_id, collection_cache.version(user_id))
+    return updated
+
+
+@timed_query
+async def rename_film(user_id: int, name: str, new_name: str):
+    # Один UPDATE в одній транзакції: фільм не зникає навіть на мить,
+    # а тригери переносять його в FTS-індексі під новою назвою
+    try:
+        async with db_pool.writer() as db:
+            cursor = await db.execute(
+                "UPDATE films SET name = ? WHERE user_id = ? AND name = ?",
+                (new_name, user_id, name),
+            )
+            await db.commit()
+    except sqlite3.IntegrityError:
+        # Фільм з новою назвою вже є в колекції
+        return False
+    except Exception as e:
+        collection_cache.invalidate(user_id)
+        tfidf_indexes.drop(user_id)
+        name_indexes.drop(user_id)
+        logger.error(f"Error renaming film '{name}' for user {user_id}: {e}")
+        return False
+    if cursor.rowcount != 1:
+        return False
+    collection_cache.rename_film(user_id, name, new_name)
+    tfidf_indexes.rename(user_id, name, new_name, collection_cache.version(user_id))
+    name_indexes.rename(user_id, name, new_name)
+    return True
+
+
+async def iter_films(user_id: int, batch=EXPORT_BATCH_SIZE):
+    # Keyset за назвою по первинному ключу: з'єднання з пулу не тримається
+    # між порціями, навіть якщо споживач (відправка файлу) повільний
+    last_name = None
+    while True:
+        if last_name is None:
+            where, params = "", (user_id, batch)
+        else:
+            where, params = " AND f.name > ?", (user_id, last_name, batch)
+        async with db_pool.reader() as db:
+            async with db.execute(
+                f"{SELECT_FILMS} WHERE f.user_id = ?{where} ORDER BY f.name LIMIT ?",
+                params,
+            ) as cursor:
+                rows = await cursor.fetchall()
+        if not rows:
+            return
+        yield [_row_to_film(row) for row in rows]
+        if len(rows) < batch:
+            return
+        last_name = rows[-1][0]
+
+
+@timed_query
+async def delete_film(user_id: int, name: str):
+    # True — фільм видалено, False — його не було, None — помилка бази
+    try:
+        async with db_pool.writer() as db:
+            async with db.execute(
+                "DELETE FROM films WHERE user_id = ? AND name = ? RETURNING rowid",
+                (user_id, name),
+            ) as cursor:
+                deleted = await cursor.fetchone() is not None
+            await db.commit()
+    except Exception as e:
+        collection_cache.invalidate(user_id)
+        tfidf_indexes.drop(user_id)
+        name_indexes.drop(user_id)
+        logger.error(f"Error deleting film '{name}' for user {user_id}: {e}")
+        return None
+    if deleted:
+        collection_cache.remove_film(user_id, name)
+        tfidf_indexes.remove(user_id, name, collection_cache.version(user_id))
+        name_indexes.remove(user_id, name)
+    return deleted
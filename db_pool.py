@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+from config import (
+    DB_CACHE_SIZE_KB,
+    DB_CACHED_STATEMENTS,
+    DB_MMAP_SIZE,
+    DB_PATH,
+    DB_READERS,
+    DB_WRITERS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    def __init__(self, path: str, readers: int = 4, writers: int = 1):
+        self.path = path
+        self.readers = readers
+        self.writers = writers
+        self._readers = None
+        self._writers = None
+        self._connections = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_open(self):
+        return bool(self._connections)
+
+    async def _connect(self):
+        conn = await aiosqlite.connect(
+            self.path, cached_statements=DB_CACHED_STATEMENTS
+        )
+        # WAL дозволяє читачам працювати паралельно з записом
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.execute(f"PRAGMA cache_size=-{int(DB_CACHE_SIZE_KB)}")
+        await conn.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE)}")
+        await conn.execute("PRAGMA temp_store=MEMORY")
+        await conn.execute("PRAGMA busy_timeout=5000")
+        self._connections.append(conn)
+        return conn
+
+    async def open(self):
+        async with self._lock:
+            if self.is_open:
+                return
+            self._readers = asyncio.Queue()
+            self._writers = asyncio.Queue()
+            try:
+                for _ in range(self.writers):
+                    self._writers.put_nowait(await self._connect())
+                for _ in range(self.readers):
+                    self._readers.put_nowait(await self._connect())
+            except Exception:
+                await self._close_connections()
+                raise
+            logger.info(
+                f"Opened SQLite pool '{self.path}' "
+                f"({self.readers} readers, {self.writers} writers)"
+            )
+
+    async def close(self):
+        async with self._lock:
+            await self._close_connections()
+
+    async def _close_connections(self):
+        connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.error(f"Error closing SQLite connection: {e}")
+        self._readers = None
+        self._writers = None
+
+    @asynccontextmanager
+    async def _acquire(self, kind: str):
+        if not self.is_open:
+            await self.open()
+        queue = self._writers if kind == "writer" else self._readers
+        conn = await queue.get()
+        try:
+            yield conn
+        finally:
+            # Пул могли закрити, поки з'єднання було зайняте
+            if conn in self._connections:
+                # Незавершена транзакція не повинна потрапити назад у пул
+                if conn.in_transaction:
+                    await conn.rollback()
+                queue.put_nowait(conn)
+
+    def reader(self):
+        return self._acquire("reader")
+
+    def writer(self):
+        return self._acquire("writer")
+
+
+db_pool = ConnectionPool(DB_PATH, readers=DB_READERS, writers=DB_WRITERS)
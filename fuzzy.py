@@ -0,0 +1,150 @@
+import heapq
+import re
+from collections import Counter, OrderedDict
+
+from config import FUZZY_MAX_USERS, FUZZY_MIN_SCORE, FUZZY_SUGGESTIONS
+
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_name(text):
+    return " ".join(WORD_RE.findall(str(text or "").casefold()))
+
+
+def trigrams(text):
+    # Два пробіли на початку, як у pg_trgm: збіг першої літери важить більше
+    padded = f"  {normalize_name(text)} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    def __init__(self, names=()):
+        self._grams = {}
+        self._normalized = {}
+        self._postings = {}
+        # Останній ранжований запит: наступні сторінки inline-режиму беруться з нього
+        self._ranked = None
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._grams)
+
+    def __contains__(self, name):
+        return name in self._grams
+
+    def add(self, name: str):
+        if name in self._grams:
+            return
+        grams = trigrams(name)
+        self._grams[name] = grams
+        self._normalized[name] = normalize_name(name)
+        self._ranked = None
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str):
+        grams = self._grams.pop(name, None)
+        self._normalized.pop(name, None)
+        self._ranked = None
+        for gram in grams or ():
+            postings = self._postings[gram]
+            postings.discard(name)
+            if not postings:
+                del self._postings[gram]
+
+    def rename(self, name: str, new_name: str):
+        self.remove(name)
+        self.add(new_name)
+
+    def search(self, text: str, limit=FUZZY_SUGGESTIONS, min_score=FUZZY_MIN_SCORE):
+        if not normalize_name(text):
+            return []
+        query = trigrams(text)
+        # Кандидати — лише назви зі спільними триграмами, а не вся колекція
+        shared = Counter()
+        for gram in query:
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for name, common in shared.items():
+            score = 2 * common / (len(query) + len(self._grams[name]))
+            if score >= min_score:
+                scored.append((-score, name))
+        return [(name, -score) for score, name in heapq.nsmallest(limit, scored)]
+
+    def rank(self, text: str, min_score=FUZZY_MIN_SCORE):
+        # Спершу назви, що починаються з запиту, далі ті, де з нього починається
+        # якесь слово, і лише потім просто схожі за триграмами
+        needle = normalize_name(text)
+        if self._ranked is not None and self._ranked[0] == needle:
+            return self._ranked[1]
+        if not needle:
+            ranked = sorted(self._grams, key=lambda name: (name.casefold(), name))
+        else:
+            shared = Counter()
+            if len(needle) < 2:
+                # Для однієї літери триграм замало — перевіряємо всі назви
+                shared.update(dict.fromkeys(self._grams, 0))
+            query = trigrams(needle)
+            for gram in query:
+                shared.update(self._postings.get(gram, ()))
+            scored = []
+            for name, common in shared.items():
+                normalized = self._normalized[name]
+                score = 2 * common / (len(query) + len(self._grams[name]))
+                if normalized.startswith(needle):
+                    tier = 0
+                elif f" {needle}" in f" {normalized}":
+                    tier = 1
+                elif score >= min_score:
+                    tier = 2
+                else:
+                    continue
+                scored.append((tier, -score, name))
+            scored.sort()
+            ranked = [name for _, _, name in scored]
+        self._ranked = (needle, ranked)
+        return ranked
+
+
+class NameIndexRegistry:
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._indexes = OrderedDict()
+
+    def get(self, user_id: int):
+        index = self._indexes.get(user_id)
+        if index is not None:
+            self._indexes.move_to_end(user_id)
+        return index
+
+    def build(self, user_id: int, names):
+        index = NameIndex(names)
+        self._indexes[user_id] = index
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    def add(self, user_id: int, name: str):
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.add(name)
+
+    def remove(self, user_id: int, name: str):
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.remove(name)
+
+    def rename(self, user_id: int, name: str, new_name: str):
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.rename(name, new_name)
+
+    def drop(self, user_id: int):
+        self._indexes.pop(user_id, None)
+
+    def clear(self):
+        self._indexes.clear()
+
+
+name_indexes = NameIndexRegistry(max_users=FUZZY_MAX_USERS)
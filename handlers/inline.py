@@ -0,0 +1,47 @@
+from aiogram import Router, types
+from aiogram.types import InlineQueryResultArticle, InputTextMessageContent
+
+from config import INLINE_CACHE_TIME, INLINE_PAGE_SIZE
+from db import films_by_names, rank_film_names
+from utils import format_film_info
+
+router = Router(name=__name__)
+
+
+def film_article(result_id: str, name: str, info: dict):
+    poster_url = info.get("poster_url")
+    return InlineQueryResultArticle(
+        id=result_id,
+        title=name,
+        description=f"{info['year']} · {info['genre'] or 'No genre'} · ⭐ {info['rating']}",
+        input_message_content=InputTextMessageContent(
+            message_text=format_film_info(name, info), parse_mode="HTML"
+        ),
+        thumbnail_url=(
+            poster_url if poster_url and poster_url.startswith("http") else None
+        ),
+    )
+
+
+@router.inline_query()
+async def inline_search(query: types.InlineQuery):
+    user_id = query.from_user.id
+    try:
+        offset = max(0, int(query.offset or 0))
+    except ValueError:
+        offset = 0
+    # Запит приходить на кожне натискання клавіші, тому ранжування йде
+    # по індексу назв у пам'яті, а з бази читається лише одна сторінка
+    names = await rank_film_names(user_id, query.query)
+    page = names[offset : offset + INLINE_PAGE_SIZE]
+    films = await films_by_names(user_id, page)
+    end = offset + len(page)
+    await query.answer(
+        [
+            film_article(str(offset + i), name, info)
+            for i, (name, info) in enumerate(films)
+        ],
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=str(end) if end < len(names) else "",
+    )
@@ -0,0 +1,87 @@
+import html
+import logging
+import tempfile
+
+from aiogram import Bot, F, Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+
+from config import IMPORT_MAX_FILE_SIZE
+from db import has_films, save_films_bulk
+from keyboards import main_kb
+from states import TransferState
+from transfer import (
+    EXPORT_FIELDS,
+    EXPORT_FORMATS,
+    CollectionExport,
+    ImportReport,
+    detect_format,
+    iter_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+router = Router(name=__name__)
+
+
+@router.message(Command("export"))
+async def export_handler(message: types.Message, command: CommandObject):
+    fmt = (command.args or "csv").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        await message.answer("Usage: /export csv or /export json")
+        return
+    user_id = message.from_user.id
+    if not await has_films(user_id):
+        await message.answer("Your collection is empty.", reply_markup=main_kb)
+        return
+    await message.answer_document(
+        CollectionExport(user_id, fmt), caption="Your film collection"
+    )
+
+
+@router.message(Command("import"))
+async def import_start(message: types.Message, state: FSMContext):
+    await message.answer(
+        "Send a CSV or JSON file with films. Columns: "
+        f"{', '.join(EXPORT_FIELDS)}.\n"
+        "Name, rating and year are required. Films with the same name are replaced.\n"
+        "/cancel - Cancelling operation"
+    )
+    await state.set_state(TransferState.waiting_for_file)
+
+
+@router.message(TransferState.waiting_for_file, F.document)
+async def import_file(message: types.Message, state: FSMContext, bot: Bot):
+    document = message.document
+    if document.file_size and document.file_size > IMPORT_MAX_FILE_SIZE:
+        await message.answer(
+            f"File is too large (max {IMPORT_MAX_FILE_SIZE // (1024 * 1024)} MB)."
+        )
+        return
+    await state.clear()
+
+    user_id = message.from_user.id
+    report = ImportReport()
+    with tempfile.TemporaryFile() as file:
+        try:
+            await bot.download(document, destination=file)
+        except Exception as e:
+            logger.error(f"Error downloading import file for user {user_id}: {e}")
+            await message.answer("Could not download the file.", reply_markup=main_kb)
+            return
+        fmt = detect_format(document.file_name, file.read(64))
+        file.seek(0)
+        saved = await save_films_bulk(user_id, report.films(iter_rows(file, fmt)))
+
+    lines = [f"Imported {saved} films, skipped {report.skipped}."]
+    if saved < report.valid:
+        lines.append("Error saving films, the import was interrupted.")
+    if report.failure:
+        lines.append(f"Stopped reading the file: {html.escape(report.failure)}")
+    lines += [html.escape(error) for error in report.errors]
+    await message.answer("\n".join(lines), parse_mode="HTML", reply_markup=main_kb)
+
+
+@router.message(TransferState.waiting_for_file)
+async def import_not_a_file(message: types.Message):
+    await message.answer("Please send a CSV or JSON file, or /cancel.")
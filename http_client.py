@@ -0,0 +1,44 @@
+import logging
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+_session = None
+
+
+def get_http_session():
+    global _session
+    # Одна сесія на весь застосунок: TCP/TLS з'єднання перевикористовуються
+    if _session is None or _session.closed:
+        _session = ClientSession(
+            connector=TCPConnector(
+                limit=HTTP_LIMIT,
+                limit_per_host=HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ),
+            timeout=ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+    return _session
+
+
+async def open_http_session():
+    get_http_session()
+    logger.info("Opened shared HTTP session")
+
+
+async def close_http_session():
+    global _session
+    session, _session = _session, None
+    if session is not None and not session.closed:
+        await session.close()
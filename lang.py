@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+
+from config import LANG_CACHE_SIZE, LANG_DETECT_SEED
+
+logger = logging.getLogger(__name__)
+
+# Літери, яких немає в російській, і навпаки
+UKRAINIAN_LETTERS = set("іїєґ")
+RUSSIAN_LETTERS = set("ыэъё")
+CYRILLIC_LOCALES = ("uk", "ru")
+
+_detect_lock = threading.Lock()
+
+
+def _is_cyrillic(ch):
+    return "Ѐ" <= ch <= "ӿ"
+
+
+def _is_latin(ch):
+    return ch.isascii() or "À" <= ch <= "ɏ"
+
+
+def script_language(text: str):
+    letters = [ch for ch in text.lower() if ch.isalpha()]
+    if not letters:
+        return ""
+    if any(ch in UKRAINIAN_LETTERS for ch in letters):
+        return "uk"
+    if any(ch in RUSSIAN_LETTERS for ch in letters):
+        return "ru"
+    # Для TMDb усі мови на латиниці однаково йдуть як en-US
+    if all(_is_latin(ch) for ch in letters):
+        return "en"
+    # Спільна кирилиця або інша писемність — потрібен повний детектор
+    return None
+
+
+def _detect(text: str, seed: int):
+    # langdetect імпортуємо лише тоді, коли він справді потрібен
+    from langdetect import DetectorFactory, detect
+    from langdetect.lang_detect_exception import LangDetectException
+
+    with _detect_lock:
+        DetectorFactory.seed = seed
+        try:
+            return detect(text)
+        except LangDetectException:
+            return ""
+
+
+def load_detector():
+    # Профілі мов langdetect читаються з диска при першому виклику
+    from langdetect import detector_factory
+
+    with _detect_lock:
+        detector_factory.init_factory()
+
+
+class LanguageResolver:
+    def __init__(self, cache_size: int, seed: int):
+        self.cache_size = cache_size
+        self.seed = seed
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.detector_calls = 0
+
+    def _remember(self, key, language):
+        self._cache[key] = language
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def resolve(self, text: str, language_code=None):
+        key = " ".join(text.lower().split())
+        fallback = (language_code or "en")[:2].lower()
+        language = script_language(key)
+        if language == "":
+            return fallback
+        if language is not None:
+            return language
+
+        # Неоднозначну кирилицю краще вгадує мова інтерфейсу Telegram
+        if fallback in CYRILLIC_LOCALES and any(_is_cyrillic(ch) for ch in key):
+            return fallback
+
+        language = self._cache.get(key)
+        if language is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.detector_calls += 1
+            try:
+                language = await asyncio.get_running_loop().run_in_executor(
+                    None, _detect, key, self.seed
+                )
+            except Exception as e:
+                logger.error(f"Error detecting language of '{text}': {e}")
+                return fallback
+            self._remember(key, language)
+        return language or fallback
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "detector_calls": self.detector_calls,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "items": len(self._cache),
+        }
+
+
+language_resolver = LanguageResolver(cache_size=LANG_CACHE_SIZE, seed=LANG_DETECT_SEED)
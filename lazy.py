@@ -0,0 +1,25 @@
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    # Модуль завантажиться при першому зверненні до його атрибутів
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def ensure_loaded(name: str):
+    module = importlib.import_module(name)
+    # Будь-яке звернення до атрибута завершує відкладений імпорт
+    getattr(module, "__spec__")
+    return module
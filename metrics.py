@@ -0,0 +1,329 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from cache import collection_cache
+from config import METRICS_LOOP_LAG_INTERVAL
+from lang import language_resolver
+from tmdb_cache import tmdb_cache
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value):
+    return repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self._values[tuple(sorted(labels.items()))] = value
+
+
+class CallbackGauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, collect):
+        self.name = name
+        self.help = help_text
+        # collect() повертає {мітки: значення}, значення читаються під час запиту
+        self.collect = collect
+
+    def samples(self):
+        try:
+            values = self.collect()
+        except Exception as e:
+            logger.error(f"Error collecting metric {self.name}: {e}")
+            return
+        for labels, value in values.items():
+            yield self.name, tuple(sorted(labels)), value
+
+
+class CallbackCounter(CallbackGauge):
+    # Монотонні лічильники, які вже веде сам компонент (кеш, резолвер мови)
+    kind = "counter"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._values = {}
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts = entry[0]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        entry[1] += seconds
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        entry = self._values.get(tuple(sorted(labels.items())))
+        return entry[2] if entry else 0
+
+    def samples(self):
+        for labels, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                yield f"{self.name}_bucket", labels + (
+                    ("le", _format_value(bound)),
+                ), cumulative
+            yield f"{self.name}_bucket", labels + (("le", "+Inf"),), count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self._register(Gauge(name, help_text))
+
+    def callback_gauge(self, name, help_text, collect):
+        return self._register(CallbackGauge(name, help_text, collect))
+
+    def callback_counter(self, name, help_text, collect):
+        return self._register(CallbackCounter(name, help_text, collect))
+
+    def histogram(self, name, help_text, buckets=BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+UPDATE_SECONDS = registry.histogram(
+    "bot_update_seconds", "Time to process one update by event type and FSM state"
+)
+HANDLER_SECONDS = registry.histogram(
+    "bot_handler_seconds", "Handler execution time by router and handler"
+)
+HANDLER_ERRORS = registry.counter(
+    "bot_handler_errors_total", "Handlers that raised an exception"
+)
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_seconds", "Time spent in db.py queries by function"
+)
+TMDB_REQUEST_SECONDS = registry.histogram(
+    "tmdb_request_seconds", "TMDb HTTP requests by endpoint and status"
+)
+LOOP_LAG = registry.gauge("event_loop_lag_seconds", "Last measured event-loop lag")
+
+
+def timed_query(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with DB_QUERY_SECONDS.time(query=func.__name__):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    # Зовнішній middleware на update: повний час обробки разом з фільтрами
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        state = data.get("raw_state") or "none"
+        with UPDATE_SECONDS.time(
+            event=getattr(event, "event_type", "unknown"), state=state
+        ):
+            return await handler(event, data)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    # Внутрішній middleware: відомо, який саме хендлер обробляє подію
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        callback = data["handler"].callback
+        labels = {
+            "router": callback.__module__,
+            "handler": callback.__name__,
+        }
+        try:
+            with HANDLER_SECONDS.time(**labels):
+                return await handler(event, data)
+        except Exception:
+            HANDLER_ERRORS.inc(**labels)
+            raise
+
+
+def instrument(dp, routers):
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    handler_middleware = HandlerMetricsMiddleware()
+    for router in routers:
+        router.message.middleware(handler_middleware)
+        router.callback_query.middleware(handler_middleware)
+        router.inline_query.middleware(handler_middleware)
+
+
+def _cache_ratios():
+    return {
+        (("cache", "collection"),): collection_cache.stats()["hit_ratio"],
+        (("cache", "tmdb"),): tmdb_cache.stats()["hit_ratio"],
+        (("cache", "language"),): language_resolver.stats()["hit_ratio"],
+    }
+
+
+def _cache_requests():
+    collection = collection_cache.stats()
+    tmdb = tmdb_cache.stats()
+    language = language_resolver.stats()
+    return {
+        (("cache", "collection"), ("result", "hit")): collection["hits"],
+        (("cache", "collection"), ("result", "miss")): collection["misses"],
+        (("cache", "tmdb"), ("result", "hit")): tmdb["hits"],
+        (("cache", "tmdb"), ("result", "disk_hit")): tmdb["disk_hits"],
+        (("cache", "tmdb"), ("result", "miss")): tmdb["misses"],
+        (("cache", "language"), ("result", "hit")): language["hits"],
+        (("cache", "language"), ("result", "miss")): language["misses"],
+    }
+
+
+registry.callback_gauge("cache_hit_ratio", "Cache hit ratio", _cache_ratios)
+registry.callback_counter(
+    "cache_requests_total", "Cache lookups by result", _cache_requests
+)
+
+
+def register_fsm_metrics(storage):
+    def collect():
+        return {
+            (("state", state),): count
+            for state, count in storage.state_counts().items()
+        }
+
+    # Лише стани, що зараз у пам'яті цього процесу, а не всі збережені в fsm_storage
+    registry.callback_gauge(
+        "fsm_states_in_memory",
+        "Users in each FSM state among records held in this process's memory",
+        collect,
+    )
+
+
+async def monitor_loop_lag(interval: float = METRICS_LOOP_LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        # Наскільки пізніше за план цикл повернув керування
+        LOOP_LAG.set(max(0.0, loop.time() - started - interval))
+
+
+async def metrics_handler(request):
+    from aiohttp import web
+
+    return web.Response(
+        text=registry.render(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+async def _loop_lag_context(app):
+    task = asyncio.create_task(monitor_loop_lag())
+    yield
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def create_metrics_app():
+    # aiohttp.web імпортуємо лише тоді, коли сервер метрик справді запускається
+    from aiohttp import web
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    app.cleanup_ctx.append(_loop_lag_context)
+    return app
+
+
+async def start_metrics_server(host: str, port: int):
+    from aiohttp import web
+
+    runner = web.AppRunner(create_metrics_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,346 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Міграції не імпортують код з db.py: схема минулих версій не повинна
+# змінюватися разом із поточним кодом
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value is not None else None
+
+
+def _split_genres(genre):
+    names = {}
+    for part in str(genre or "").split(","):
+        part = part.strip()
+        if part:
+            names.setdefault(_normalize(part), part)
+    return list(names.items())
+
+
+FTS_TRIGGERS_V1 = (
+    """
+    CREATE TRIGGER IF NOT EXISTS films_fts_insert AFTER INSERT ON films BEGIN
+        INSERT INTO films_fts (rowid, owner, name, description, genre)
+        VALUES (new.rowid, 'u' || new.user_id, new.name, new.description, new.genre);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS films_fts_delete AFTER DELETE ON films BEGIN
+        INSERT INTO films_fts (films_fts, rowid, owner, name, description, genre)
+        VALUES ('delete', old.rowid, 'u' || old.user_id, old.name, old.description, old.genre);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS films_fts_update AFTER UPDATE ON films BEGIN
+        INSERT INTO films_fts (films_fts, rowid, owner, name, description, genre)
+        VALUES ('delete', old.rowid, 'u' || old.user_id, old.name, old.description, old.genre);
+        INSERT INTO films_fts (rowid, owner, name, description, genre)
+        VALUES (new.rowid, 'u' || new.user_id, new.name, new.description, new.genre);
+    END
+    """,
+)
+
+
+async def _schema_v1(db):
+    # Схема до появи міграцій; бази, створені старим init_db, теж проходять
+    # цей крок, тому все через IF NOT EXISTS
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS films (
+            user_id INTEGER,
+            name TEXT,
+            rating REAL,
+            year INTEGER,
+            genre TEXT,
+            description TEXT,
+            tag TEXT,
+            review TEXT,
+            poster_url TEXT,
+            trailer TEXT,
+            genre_norm TEXT,
+            PRIMARY KEY (user_id, name)
+        )
+    """)
+    async with db.execute("PRAGMA table_info(films)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+    if "genre_norm" not in columns:
+        await db.execute("ALTER TABLE films ADD COLUMN genre_norm TEXT")
+        async with db.execute(
+            "SELECT rowid, genre FROM films WHERE genre IS NOT NULL"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        await db.executemany(
+            "UPDATE films SET genre_norm = ? WHERE rowid = ?",
+            [(_normalize(genre), rowid) for rowid, genre in rows],
+        )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_films_user_rating_name "
+        "ON films (user_id, rating DESC, name)"
+    )
+    await db.execute("DROP INDEX IF EXISTS idx_films_user_rating")
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_films_user_year ON films (user_id, year)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_films_user_tag "
+        "ON films (user_id, tag COLLATE NOCASE)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_films_user_genre ON films (user_id, genre_norm)"
+    )
+
+    async with db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'films_fts'"
+    ) as cursor:
+        fts_exists = await cursor.fetchone() is not None
+    await db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS films_fts USING fts5(
+            owner, name, description, genre,
+            content='',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    for trigger in FTS_TRIGGERS_V1:
+        await db.execute(trigger)
+    if not fts_exists:
+        await db.execute(
+            "INSERT INTO films_fts (rowid, owner, name, description, genre) "
+            "SELECT rowid, 'u' || user_id, name, description, genre FROM films"
+        )
+
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS tmdb_cache (
+            key TEXT PRIMARY KEY,
+            status INTEGER,
+            payload TEXT,
+            expires_at REAL
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS fsm_storage (
+            key TEXT PRIMARY KEY,
+            user_id INTEGER,
+            state TEXT,
+            data TEXT,
+            expires_at REAL
+        )
+    """)
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fsm_storage_expires "
+        "ON fsm_storage (expires_at)"
+    )
+
+
+FILMS_TRIGGERS_V2 = (
+    # Contentless FTS видаляє рядок лише за тими самими значеннями, що були
+    # проіндексовані, тому опис і жанр беремо з movies до видалення фільму
+    """
+    CREATE TRIGGER films_fts_insert AFTER INSERT ON films BEGIN
+        INSERT INTO films_fts (rowid, owner, name, description, genre)
+        SELECT new.rowid, 'u' || new.user_id, new.name, m.description, m.genre
+        FROM movies m WHERE m.id = new.movie_id;
+    END
+    """,
+    """
+    CREATE TRIGGER films_delete AFTER DELETE ON films BEGIN
+        INSERT INTO films_fts (films_fts, rowid, owner, name, description, genre)
+        SELECT 'delete', old.rowid, 'u' || old.user_id, old.name, m.description, m.genre
+        FROM movies m WHERE m.id = old.movie_id;
+        DELETE FROM movies WHERE id = old.movie_id AND tmdb_id IS NULL
+            AND NOT EXISTS (SELECT 1 FROM films WHERE movie_id = old.movie_id);
+    END
+    """,
+    """
+    CREATE TRIGGER films_update AFTER UPDATE OF name, movie_id ON films
+    WHEN old.name IS NOT new.name OR old.movie_id IS NOT new.movie_id BEGIN
+        INSERT INTO films_fts (films_fts, rowid, owner, name, description, genre)
+        SELECT 'delete', old.rowid, 'u' || old.user_id, old.name, m.description, m.genre
+        FROM movies m WHERE m.id = old.movie_id;
+        INSERT INTO films_fts (rowid, owner, name, description, genre)
+        SELECT new.rowid, 'u' || new.user_id, new.name, m.description, m.genre
+        FROM movies m WHERE m.id = new.movie_id;
+        DELETE FROM movies WHERE id = old.movie_id AND old.movie_id != new.movie_id
+            AND tmdb_id IS NULL
+            AND NOT EXISTS (SELECT 1 FROM films WHERE movie_id = old.movie_id);
+    END
+    """,
+    """
+    CREATE TRIGGER movies_fts_update AFTER UPDATE OF description, genre ON movies
+    WHEN old.description IS NOT new.description OR old.genre IS NOT new.genre BEGIN
+        INSERT INTO films_fts (films_fts, rowid, owner, name, description, genre)
+        SELECT 'delete', f.rowid, 'u' || f.user_id, f.name, old.description, old.genre
+        FROM films f WHERE f.movie_id = old.id;
+        INSERT INTO films_fts (rowid, owner, name, description, genre)
+        SELECT f.rowid, 'u' || f.user_id, f.name, new.description, new.genre
+        FROM films f WHERE f.movie_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER movies_delete AFTER DELETE ON movies BEGIN
+        DELETE FROM movie_genres WHERE movie_id = old.id;
+    END
+    """,
+)
+
+
+async def _normalize_films(db):
+    # Дані TMDb (опис, жанри, постер, трейлер) живуть в одному рядку movies
+    # на фільм, а в films лишаються тільки поля користувача
+    await db.execute("""
+        CREATE TABLE movies (
+            id INTEGER PRIMARY KEY,
+            tmdb_id INTEGER UNIQUE,
+            title TEXT,
+            year INTEGER,
+            genre TEXT,
+            description TEXT,
+            poster_url TEXT,
+            trailer TEXT,
+            vote_average REAL
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE genres (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_norm TEXT NOT NULL UNIQUE
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE movie_genres (
+            movie_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            genre_id INTEGER NOT NULL,
+            PRIMARY KEY (movie_id, position)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("""
+        CREATE TABLE tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """)
+
+    for trigger in ("films_fts_insert", "films_fts_delete", "films_fts_update"):
+        await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    await db.execute("DROP TABLE IF EXISTS films_fts")
+    await db.execute("ALTER TABLE films RENAME TO films_v1")
+    await db.execute("""
+        CREATE TABLE films (
+            user_id INTEGER,
+            name TEXT,
+            movie_id INTEGER REFERENCES movies (id),
+            rating REAL,
+            tag_id INTEGER REFERENCES tags (id),
+            review TEXT,
+            PRIMARY KEY (user_id, name)
+        )
+    """)
+
+    # Старі рядки не знають свого tmdb_id, тож кожен стає окремим фільмом
+    # каталогу з тим самим id, що й rowid
+    await db.execute(
+        "INSERT INTO movies (id, title, year, genre, description, poster_url, trailer) "
+        "SELECT rowid, name, year, genre, description, poster_url, trailer "
+        "FROM films_v1"
+    )
+    await db.execute(
+        "INSERT OR IGNORE INTO tags (name) "
+        "SELECT DISTINCT tag FROM films_v1 WHERE tag IS NOT NULL AND tag != ''"
+    )
+    await db.execute(
+        "INSERT INTO films (rowid, user_id, name, movie_id, rating, tag_id, review) "
+        "SELECT v.rowid, v.user_id, v.name, v.rowid, v.rating, t.id, v.review "
+        "FROM films_v1 v LEFT JOIN tags t ON t.name = v.tag"
+    )
+    async with db.execute(
+        "SELECT rowid, genre FROM films_v1 WHERE genre IS NOT NULL"
+    ) as cursor:
+        rows = await cursor.fetchall()
+    genre_ids = {}
+    links = []
+    for movie_id, genre in rows:
+        for position, (norm, name) in enumerate(_split_genres(genre)):
+            if norm not in genre_ids:
+                cursor = await db.execute(
+                    "INSERT INTO genres (name, name_norm) VALUES (?, ?)", (name, norm)
+                )
+                genre_ids[norm] = cursor.lastrowid
+            links.append((movie_id, position, genre_ids[norm]))
+    await db.executemany(
+        "INSERT INTO movie_genres (movie_id, position, genre_id) VALUES (?, ?, ?)",
+        links,
+    )
+    await db.execute("DROP TABLE films_v1")
+
+    await db.execute(
+        "CREATE INDEX idx_films_user_rating_name ON films (user_id, rating DESC, name)"
+    )
+    await db.execute("CREATE INDEX idx_films_user_tag ON films (user_id, tag_id)")
+    await db.execute("CREATE INDEX idx_films_movie ON films (movie_id)")
+    await db.execute("""
+        CREATE VIRTUAL TABLE films_fts USING fts5(
+            owner, name, description, genre,
+            content='',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    await db.execute(
+        "INSERT INTO films_fts (rowid, owner, name, description, genre) "
+        "SELECT f.rowid, 'u' || f.user_id, f.name, m.description, m.genre "
+        "FROM films f JOIN movies m ON m.id = f.movie_id"
+    )
+    for trigger in FILMS_TRIGGERS_V2:
+        await db.execute(trigger)
+
+
+async def _fsm_updated_at(db):
+    # Час останнього запису стану: за ним інші процеси бачать, що їхня копія застаріла
+    await db.execute(
+        "ALTER TABLE fsm_storage ADD COLUMN updated_at REAL NOT NULL DEFAULT 0"
+    )
+
+
+async def _tag_order_index(db):
+    # Вибірка за тегом сортується як і решта (rating DESC, name): без цих колонок
+    # в індексі SQLite обирав idx_films_user_rating_name заради порядку
+    # і перевіряв тег у кожного фільму користувача
+    await db.execute("DROP INDEX IF EXISTS idx_films_user_tag")
+    await db.execute(
+        "CREATE INDEX idx_films_user_tag_rating_name "
+        "ON films (user_id, tag_id, rating DESC, name)"
+    )
+
+
+MIGRATIONS = (
+    (1, _schema_v1),
+    (2, _normalize_films),
+    (3, _fsm_updated_at),
+    (4, _tag_order_index),
+)
+
+
+async def schema_version(db):
+    async with db.execute("PRAGMA user_version") as cursor:
+        (version,) = await cursor.fetchone()
+    return version
+
+
+async def migrate(db, migrations=MIGRATIONS):
+    version = await schema_version(db)
+    for target, migration in migrations:
+        if target <= version:
+            continue
+        logger.info(f"Migrating database schema to version {target}")
+        # Кожна міграція — окрема транзакція разом зі зміною user_version
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await migration(db)
+            await db.execute(f"PRAGMA user_version = {int(target)}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        version = target
+    return version
@@ -0,0 +1,101 @@
+import html
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from config import PAGE_FETCH_SIZE
+from db import films_page, has_films_beyond
+from utils import format_film_info
+
+MESSAGE_LIMIT = 4096
+# callback_data у Telegram обмежена 64 байтами
+MAX_VALUE_BYTES = 24
+
+PAGE_TITLES = {
+    "all": "<b>Movie rating:</b>",
+    "rating": "<b>Movies in rating '{value}':</b>",
+    "year": "<b>Movies in year '{value}':</b>",
+    "genre": "<b>Movies in genre '{value}':</b>",
+    "tag": "<b>Movies with tag '{value}':</b>",
+}
+
+
+class FilmsPage(CallbackData, prefix="films"):
+    kind: str
+    value: str
+    cursor: int
+    direction: str
+
+
+def short_value(value) -> str:
+    value = str(value).replace(":", " ").strip()
+    encoded = value.encode("utf-8")[:MAX_VALUE_BYTES]
+    return encoded.decode("utf-8", errors="ignore")
+
+
+def pack_films(header: str, films, limit=MESSAGE_LIMIT):
+    # Беремо стільки фільмів, скільки вміщується в одне повідомлення
+    budget = limit - len(header)
+    blocks = []
+    used = 0
+    for rowid, name, info in films:
+        block = format_film_info(name, info)
+        extra = len(block) + (2 if blocks else 0)
+        if blocks and used + extra > budget:
+            break
+        blocks.append((rowid, block))
+        used += extra
+    return blocks
+
+
+def page_keyboard(kind, value, first, last, has_prev, has_next):
+    buttons = []
+    if has_prev:
+        buttons.append(
+            InlineKeyboardButton(
+                text="⬅️ Prev",
+                callback_data=FilmsPage(
+                    kind=kind, value=value, cursor=first, direction="prev"
+                ).pack(),
+            )
+        )
+    if has_next:
+        buttons.append(
+            InlineKeyboardButton(
+                text="Next ➡️",
+                callback_data=FilmsPage(
+                    kind=kind, value=value, cursor=last, direction="next"
+                ).pack(),
+            )
+        )
+    return InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+
+
+async def build_page(user_id: int, kind: str, value, cursor=None, direction="next"):
+    value = short_value(value)
+    try:
+        films, backwards = await films_page(
+            user_id, kind, value, cursor, direction, PAGE_FETCH_SIZE
+        )
+    except ValueError:
+        # callback_data приходить від клієнта: застаріла чи підроблена кнопка
+        # з невідомим фільтром або значенням не повинна ламати хендлер
+        return None
+    if not films and cursor is not None:
+        # Фільми на краю списку могли видалити — показуємо першу сторінку
+        films, backwards = await films_page(user_id, kind, value, limit=PAGE_FETCH_SIZE)
+    if not films:
+        return None
+
+    header = PAGE_TITLES[kind].format(value=html.escape(value)) + "\n\n"
+    blocks = pack_films(header, films)
+    if backwards:
+        blocks.reverse()
+    first, last = blocks[0][0], blocks[-1][0]
+    has_prev = await has_films_beyond(user_id, kind, value, first, "prev")
+    has_next = (not backwards and len(blocks) < len(films)) or (
+        await has_films_beyond(user_id, kind, value, last, "next")
+    )
+    text = header + "\n\n".join(block for _, block in blocks)
+    markup = page_keyboard(kind, value, first, last, has_prev, has_next)
+    return text, markup, len(blocks)
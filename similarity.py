@@ -0,0 +1,221 @@
+import math
+import re
+from collections import OrderedDict
+
+from config import TFIDF_MAX_USERS, TFIDF_NGRAM
+from lazy import lazy_import
+
+# NumPy потрібен лише для TF-IDF, тому не гальмує старт бота
+np = lazy_import("numpy")
+
+WORD_RE = re.compile(r"\w+")
+
+
+def char_ngrams(text, n=TFIDF_NGRAM):
+    # Символьні n-грами стійкі до опечаток і різних форм слова
+    padded = f" {' '.join(WORD_RE.findall(str(text or '').lower()))} "
+    return [padded[i : i + n] for i in range(len(padded) - n + 1)]
+
+
+class TfidfIndex:
+    def __init__(self):
+        self.vocab = {}
+        self._df = np.zeros(1024, dtype=np.float64)
+        self._slots = {}
+        self._names = []
+        self._terms = []
+        self._free = []
+        # Розріджена матриця документів у форматі COO
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._cols = np.zeros(0, dtype=np.int64)
+        self._vals = np.zeros(0, dtype=np.float64)
+        self._pending = []
+        self._removed = set()
+        self._weights = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    @classmethod
+    def from_films(cls, films: dict):
+        index = cls()
+        for name, info in films.items():
+            index.add(name, info.get("description"))
+        return index
+
+    def _term_ids(self, text, grow: bool):
+        ids = []
+        for gram in char_ngrams(text):
+            term_id = self.vocab.get(gram)
+            if term_id is None:
+                if not grow:
+                    continue
+                term_id = len(self.vocab)
+                self.vocab[gram] = term_id
+            ids.append(term_id)
+        if len(self.vocab) > len(self._df):
+            size = max(len(self._df) * 2, len(self.vocab))
+            self._df = np.concatenate(
+                [self._df, np.zeros(size - len(self._df), dtype=np.float64)]
+            )
+        return np.unique(np.asarray(ids, dtype=np.int64), return_counts=True)
+
+    def add(self, name, text):
+        if name in self._slots:
+            self.remove(name)
+        cols, counts = self._term_ids(text, grow=True)
+        if self._free:
+            slot = self._free.pop()
+            self._names[slot] = name
+            self._terms[slot] = cols
+        else:
+            slot = len(self._names)
+            self._names.append(name)
+            self._terms.append(cols)
+        self._slots[name] = slot
+        self._df[cols] += 1
+        self._pending.append((slot, cols, counts.astype(np.float64)))
+        self._weights = None
+
+    def remove(self, name):
+        slot = self._slots.pop(name, None)
+        if slot is None:
+            return
+        self._df[self._terms[slot]] -= 1
+        self._names[slot] = None
+        self._terms[slot] = None
+        self._removed.add(slot)
+        # Рядок ще міг не потрапити в матрицю
+        self._pending = [item for item in self._pending if item[0] != slot]
+        self._free.append(slot)
+        self._weights = None
+
+    def rename(self, name, new_name):
+        slot = self._slots.pop(name, None)
+        if slot is None:
+            return
+        if new_name in self._slots:
+            self.remove(new_name)
+        # Опис не змінився, тож рядок матриці лишається тим самим
+        self._names[slot] = new_name
+        self._slots[new_name] = slot
+
+    def _materialize(self):
+        if self._removed:
+            keep = ~np.isin(self._rows, np.fromiter(self._removed, dtype=np.int64))
+            self._rows = self._rows[keep]
+            self._cols = self._cols[keep]
+            self._vals = self._vals[keep]
+            self._removed.clear()
+        if self._pending:
+            self._rows = np.concatenate(
+                [self._rows]
+                + [
+                    np.full(len(cols), slot, dtype=np.int64)
+                    for slot, cols, _ in self._pending
+                ]
+            )
+            self._cols = np.concatenate(
+                [self._cols] + [cols for _, cols, _ in self._pending]
+            )
+            self._vals = np.concatenate(
+                [self._vals] + [vals for _, _, vals in self._pending]
+            )
+            self._pending = []
+
+    def _prepare(self):
+        if self._weights is not None:
+            return self._weights
+        self._materialize()
+        n_docs = len(self._slots)
+        df = self._df[: len(self.vocab)]
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+        weighted = self._vals * idf[self._cols]
+        norms = np.sqrt(
+            np.bincount(self._rows, weights=weighted**2, minlength=len(self._names))
+        )
+        self._weights = (idf, norms)
+        return self._weights
+
+    def search(self, query, threshold=0.2, top_n=5):
+        if not self._slots:
+            return []
+        idf, norms = self._prepare()
+        q_cols, q_counts = self._term_ids(query, grow=False)
+        if not len(q_cols):
+            return []
+        q_weights = q_counts * idf[q_cols]
+        q_norm = math.sqrt(float(np.dot(q_weights, q_weights)))
+        # Один розріджений добуток матриці на вектор замість циклу по фільмах
+        query_vector = np.zeros(len(idf), dtype=np.float64)
+        query_vector[q_cols] = q_weights * idf[q_cols]
+        scores = np.bincount(
+            self._rows,
+            weights=self._vals * query_vector[self._cols],
+            minlength=len(self._names),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(norms > 0, scores / (norms * q_norm), 0.0)
+        candidates = np.flatnonzero(scores >= threshold)
+        if len(candidates) > top_n:
+            top = np.argpartition(-scores[candidates], top_n - 1)[:top_n]
+            candidates = candidates[top]
+        ranked = sorted(
+            ((float(scores[slot]), self._names[slot]) for slot in candidates),
+            reverse=True,
+        )
+        return [(score, name) for score, name in ranked if name is not None]
+
+
+class TfidfRegistry:
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        # user_id -> (версія колекції, індекс)
+        self._indexes = OrderedDict()
+
+    def get(self, user_id: int, films: dict, version=None):
+        # version — версія collection_cache, з якої взято films; None означає,
+        # що знімок міг застаріти, і індекс з нього не кешується
+        cached = self._indexes.get(user_id)
+        if cached is not None and version is not None and cached[0] == version:
+            self._indexes.move_to_end(user_id)
+            return cached[1]
+        # Індекс будується ліниво, при першому пошуку
+        index = TfidfIndex.from_films(films)
+        if version is None:
+            return index
+        self._indexes[user_id] = (version, index)
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    def _apply(self, user_id: int, version, change=None):
+        cached = self._indexes.get(user_id)
+        if cached is not None:
+            if change is not None:
+                change(cached[1])
+            # Індекс уже містить цей запис — він відповідає новій версії колекції
+            self._indexes[user_id] = (version, cached[1])
+
+    def update(self, user_id: int, name: str, description, version=None):
+        self._apply(user_id, version, lambda index: index.add(name, description))
+
+    def remove(self, user_id: int, name: str, version=None):
+        self._apply(user_id, version, lambda index: index.remove(name))
+
+    def rename(self, user_id: int, name: str, new_name: str, version=None):
+        self._apply(user_id, version, lambda index: index.rename(name, new_name))
+
+    def keep(self, user_id: int, version=None):
+        # Запис не змінив описів: індекс актуальний і для нової версії
+        self._apply(user_id, version)
+
+    def drop(self, user_id: int):
+        self._indexes.pop(user_id, None)
+
+    def clear(self):
+        self._indexes.clear()
+
+
+tfidf_indexes = TfidfRegistry(max_users=TFIDF_MAX_USERS)
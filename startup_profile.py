@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(module: str = "bot"):
+    # Чистий процес: інакше модулі вже лежать у sys.modules і час нульовий
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append(
+                {
+                    "module": name,
+                    "depth": len(indent) // 2,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                }
+            )
+    # importtime пише дочірні модулі перед батьківським, тож піддерево
+    # модуля — це рядки глибше нульового рівня прямо перед ним
+    index = next(
+        (i for i, row in enumerate(rows) if row["module"] == module), len(rows)
+    )
+    total = rows[index]["cumulative_ms"] if index < len(rows) else None
+    direct = []
+    for row in reversed(rows[:index]):
+        if row["depth"] == 0:
+            break
+        if row["depth"] == 1:
+            direct.append(row)
+    # Прямі імпорти модуля: саме їх можна зробити лінивими
+    direct.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return {"module": module, "total_ms": total, "imports": direct}
+
+
+def copy_database(source: str, target: str):
+    # backup() дає цілісну копію навіть з незакомігованим WAL
+    if not os.path.exists(source):
+        return
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+async def profile_init(db_path=None):
+    from bot import register_handlers
+    from db import init_db
+    from db_pool import db_pool
+    from http_client import close_http_session, open_http_session
+    from lang import load_detector
+    from similarity import np
+    from tmdb_cache import tmdb_cache
+
+    steps = {}
+    # Міграції й очищення кешу виконуються на тимчасовій копії, а не на робочій базі
+    tmp = tempfile.TemporaryDirectory()
+    original_path = db_pool.path
+    db_pool.path = os.path.join(tmp.name, "profile.db")
+    copy_database(db_path or original_path, db_pool.path)
+
+    async def step(name, func):
+        started = time.perf_counter()
+        result = func()
+        if hasattr(result, "__await__"):
+            await result
+        steps[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    try:
+        await step("register_handlers", register_handlers)
+        await step("db_pool.open", db_pool.open)
+        await step("init_db", init_db)
+        await step("tmdb_cache.purge_expired", tmdb_cache.purge_expired)
+        await step("open_http_session", open_http_session)
+        # Після старту langdetect довантажується в потоці, а NumPy — у циклі подій
+        await step("warm_up: langdetect", load_detector)
+        await step("warm_up: numpy", lambda: np.zeros(1))
+    finally:
+        await close_http_session()
+        await db_pool.close()
+        db_pool.path = original_path
+        tmp.cleanup()
+    return steps
+
+
+async def run(json_path=None, top: int = 15, db_path=None):
+    imports = profile_imports()
+    init = await profile_init(db_path)
+
+    print(f"import bot: {imports['total_ms']:.1f} ms")
+    for row in imports["imports"][:top]:
+        print(f"  {row['module']:<40} {row['cumulative_ms']:>10.1f} ms")
+    print("init:")
+    for name, ms in init.items():
+        print(f"  {name:<40} {ms:>10.1f} ms")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"imports": imports, "init": init}, f, indent=2)
@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from config import (
+    FSM_FLUSH_BATCH,
+    FSM_FLUSH_INTERVAL,
+    FSM_MEMORY_SIZE,
+    FSM_RECHECK_INTERVAL,
+    FSM_STATE_TTL,
+)
+from db_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+
+def storage_key(key: StorageKey):
+    return ":".join(
+        str(part) if part is not None else ""
+        for part in (
+            key.bot_id,
+            key.chat_id,
+            key.user_id,
+            key.thread_id,
+            key.business_connection_id,
+            key.destiny,
+        )
+    )
+
+
+class _Record:
+    __slots__ = ("user_id", "state", "data", "expires_at", "updated_at", "checked_at")
+
+    def __init__(self, user_id, state=None, data=None, expires_at=0.0, updated_at=0.0):
+        self.user_id = user_id
+        self.state = state
+        self.data = data if data is not None else {}
+        self.expires_at = expires_at
+        self.updated_at = updated_at
+        self.checked_at = time.monotonic()
+
+    @property
+    def is_empty(self):
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    def __init__(
+        self,
+        pool=db_pool,
+        ttl: float = FSM_STATE_TTL,
+        flush_interval: float = FSM_FLUSH_INTERVAL,
+        flush_batch: int = FSM_FLUSH_BATCH,
+        memory_size: int = FSM_MEMORY_SIZE,
+        recheck_interval: float = FSM_RECHECK_INTERVAL,
+    ):
+        self.pool = pool
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.memory_size = memory_size
+        self.recheck_interval = recheck_interval
+        self._records = OrderedDict()
+        self._dirty = set()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flusher = None
+        self._last_purge = 0.0
+
+    async def _load(self, key: StorageKey):
+        name = storage_key(key)
+        record = self._records.get(name)
+        now = time.time()
+        if record is not None:
+            if not record.is_empty and record.expires_at <= now:
+                # Покинутий стан: скидаємо і видаляємо з бази при наступному flush
+                record = _Record(key.user_id)
+                self._records[name] = record
+                self._dirty.add(name)
+                return record
+            # Незбережені зміни новіші за базу; збережені звіряємо з нею не частіше
+            # за recheck_interval, бо стан міг змінити інший процес
+            if (
+                name in self._dirty
+                or time.monotonic() - record.checked_at < self.recheck_interval
+            ):
+                self._records.move_to_end(name)
+                return record
+        try:
+            async with self.pool.reader() as db:
+                async with db.execute(
+                    "SELECT state, data, updated_at FROM fsm_storage "
+                    "WHERE key = ? AND expires_at > ?",
+                    (name, now),
+                ) as cursor:
+                    row = await cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error loading FSM state: {e}")
+            if record is not None:
+                return record
+            row = None
+        # Поки читали базу, запис міг з'явитися або змінитися в пам'яті
+        current = self._records.get(name)
+        if current is not None and (current is not record or name in self._dirty):
+            return current
+        if current is not None and (row[2] if row else 0.0) == current.updated_at:
+            current.checked_at = time.monotonic()
+            self._records.move_to_end(name)
+            return current
+        if row is None:
+            record = _Record(key.user_id)
+        else:
+            state, data, updated_at = row
+            record = _Record(
+                key.user_id,
+                state,
+                json.loads(data) if data else {},
+                now + self.ttl,
+                updated_at,
+            )
+        self._remember(name, record)
+        return record
+
+    def _remember(self, name, record):
+        self._records[name] = record
+        self._records.move_to_end(name)
+        # Витісняємо лише записи, які вже збережені в базі
+        if len(self._records) > self.memory_size:
+            for old in list(self._records):
+                if len(self._records) <= self.memory_size:
+                    break
+                if old not in self._dirty:
+                    del self._records[old]
+
+    def _touch(self, key: StorageKey, record: _Record):
+        name = storage_key(key)
+        record.updated_at = time.time()
+        record.expires_at = record.updated_at + self.ttl
+        self._remember(name, record)
+        self._dirty.add(name)
+        self._start_flusher()
+        if len(self._dirty) >= self.flush_batch:
+            self._wakeup.set()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._touch(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = await self._load(key)
+        return record.state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, got {type(data).__name__}")
+        record = await self._load(key)
+        record.data = data.copy()
+        self._touch(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = await self._load(key)
+        return record.data.copy()
+
+    def _start_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if time.time() - self._last_purge > self.ttl / 10:
+                await self.purge_expired()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            names, self._dirty = self._dirty, set()
+            rows = []
+            deleted = []
+            for name in names:
+                record = self._records.get(name)
+                if record is None or record.is_empty:
+                    deleted.append((name,))
+                    continue
+                try:
+                    data = json.dumps(record.data, ensure_ascii=False)
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Error serializing FSM data for '{name}': {e}")
+                    continue
+                rows.append(
+                    (
+                        name,
+                        record.user_id,
+                        record.state,
+                        data,
+                        record.expires_at,
+                        record.updated_at,
+                    )
+                )
+            try:
+                # Усі зміни за інтервал пишемо однією транзакцією
+                async with self.pool.writer() as db:
+                    await db.executemany(
+                        "INSERT OR REPLACE INTO fsm_storage "
+                        "(key, user_id, state, data, expires_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    await db.executemany(
+                        "DELETE FROM fsm_storage WHERE key = ?", deleted
+                    )
+                    await db.commit()
+            except asyncio.CancelledError:
+                self._dirty |= names
+                raise
+            except Exception as e:
+                logger.error(f"Error flushing FSM storage: {e}")
+                self._dirty |= names
+
+    async def purge_expired(self):
+        now = time.time()
+        self._last_purge = now
+        for name, record in list(self._records.items()):
+            if name not in self._dirty and record.expires_at <= now:
+                del self._records[name]
+        try:
+            async with self.pool.writer() as db:
+                await db.execute(
+                    "DELETE FROM fsm_storage WHERE expires_at <= ?", (now,)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error purging FSM storage: {e}")
+
+    def stats(self):
+        return {
+            "memory_records": len(self._records),
+            "dirty": len(self._dirty),
+            "active_states": sum(
+                1 for record in self._records.values() if record.state is not None
+            ),
+        }
+
+    def state_counts(self):
+        counts = {}
+        now = time.time()
+        for record in self._records.values():
+            if record.state is not None and record.expires_at > now:
+                counts[record.state] = counts.get(record.state, 0) + 1
+        return counts
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
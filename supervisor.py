@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import multiprocessing
+
+from config import (
+    METRICS_HOST,
+    METRICS_PORT,
+    RUN_MODE,
+    WEBHOOK_HOST,
+    WEBHOOK_MAX_CONCURRENCY,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    WORKER_PROCESSES,
+    WORKER_SHUTDOWN_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+POLLING_TIMEOUT = 30
+
+
+def update_user_id(data: dict):
+    for event in data.values():
+        if not isinstance(event, dict):
+            continue
+        user = event.get("from") or event.get("user")
+        if isinstance(user, dict) and "id" in user:
+            return user["id"]
+        chat = event.get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return chat["id"]
+    return None
+
+
+def shard_for(data: dict, workers: int):
+    # Усі апдейти одного користувача потрапляють в один процес:
+    # його FSM-стан і кеш колекції живуть лише там
+    user_id = update_user_id(data)
+    if user_id is None:
+        user_id = data.get("update_id", 0)
+    return hash(user_id) % workers
+
+
+class UpdateRouter:
+    def __init__(self, queues):
+        self.queues = queues
+
+    def route(self, data: dict):
+        self.queues[shard_for(data, len(self.queues))].put(data)
+
+    async def handle_update(self, data: dict):
+        self.route(data)
+
+
+def run_worker(index: int, queue):
+    asyncio.run(_worker_main(index, queue))
+
+
+async def _worker_main(index: int, queue):
+    # Імпорт тут, щоб кожен процес створив власні пул, сесію та диспетчер
+    from bot import bot, dp, handle_update, register_handlers
+    from db_pool import db_pool
+    from http_client import close_http_session, open_http_session
+    from metrics import start_metrics_server
+    from webhook import UpdateRunner
+
+    register_handlers()
+    await db_pool.open()
+    await open_http_session()
+    metrics_runner = None
+    if METRICS_PORT:
+        # Кожен воркер віддає власні метрики на своєму порту
+        metrics_runner = await start_metrics_server(
+            METRICS_HOST, METRICS_PORT + index + 1
+        )
+    runner = UpdateRunner(handle_update, WEBHOOK_MAX_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    await dp.emit_startup(bot=bot)
+    logger.info(f"Worker {index} started")
+    try:
+        while True:
+            # Черга процесу блокуюча, тому чекаємо на неї в окремому потоці
+            data = await loop.run_in_executor(None, queue.get)
+            if data is None:
+                break
+            await runner.submit(data)
+    finally:
+        await runner.drain()
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await close_http_session()
+        await db_pool.close()
+        logger.info(f"Worker {index} stopped")
+
+
+def start_workers(count: int):
+    context = multiprocessing.get_context("spawn")
+    queues = []
+    processes = []
+    for index in range(count):
+        queue = context.Queue()
+        process = context.Process(
+            target=run_worker, args=(index, queue), name=f"bot-worker-{index}"
+        )
+        process.start()
+        queues.append(queue)
+        processes.append(process)
+    return queues, processes
+
+
+def stop_workers(queues, processes):
+    for queue in queues:
+        queue.put(None)
+    for process in processes:
+        process.join(WORKER_SHUTDOWN_TIMEOUT)
+        if process.is_alive():
+            logger.warning(f"{process.name} did not stop in time, terminating")
+            process.terminate()
+            process.join()
+
+
+async def poll_updates(bot, allowed_updates, route):
+    await bot.delete_webhook()
+    offset = None
+    while True:
+        try:
+            updates = await bot.get_updates(
+                offset=offset, timeout=POLLING_TIMEOUT, allowed_updates=allowed_updates
+            )
+        except Exception as e:
+            logger.error(f"Error fetching updates: {e}")
+            await asyncio.sleep(1)
+            continue
+        for update in updates:
+            offset = update.update_id + 1
+            route(update.model_dump(mode="json", exclude_unset=True, by_alias=True))
+
+
+async def main():
+    from bot import bot, dp, register_handlers
+    from db import init_db
+    from db_pool import db_pool
+    from tmdb_cache import tmdb_cache
+    from webhook import create_app, serve
+
+    # Схему створює лише супервізор, до старту воркерів
+    register_handlers()
+    await db_pool.open()
+    try:
+        await init_db()
+        await tmdb_cache.purge_expired()
+    finally:
+        await db_pool.close()
+
+    queues, processes = start_workers(WORKER_PROCESSES)
+    router = UpdateRouter(queues)
+    try:
+        if RUN_MODE == "webhook":
+            app = create_app(
+                router.handle_update,
+                WEBHOOK_PATH,
+                WEBHOOK_SECRET,
+                WEBHOOK_MAX_CONCURRENCY,
+            )
+            await bot.set_webhook(
+                WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+                secret_token=WEBHOOK_SECRET or None,
+                allowed_updates=dp.resolve_used_update_types(),
+                max_connections=min(WEBHOOK_MAX_CONCURRENCY, 100),
+            )
+            await serve(app, WEBHOOK_HOST, WEBHOOK_PORT)
+        else:
+            await poll_updates(bot, dp.resolve_used_update_types(), router.route)
+    finally:
+        await bot.session.close()
+        await asyncio.get_running_loop().run_in_executor(
+            None, stop_workers, queues, processes
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(processName)s - %(name)s - %(message)s",
+    )
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
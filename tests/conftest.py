@@ -0,0 +1,48 @@
+import pytest_asyncio
+from aiohttp.test_utils import TestServer
+
+import tmdb
+from benchmarks.fake_tmdb import Corpus, create_app
+from cache import collection_cache
+from db import init_db
+from db_pool import db_pool
+from fuzzy import name_indexes
+from http_client import close_http_session
+from similarity import tfidf_indexes
+from tmdb_cache import tmdb_cache
+
+
+@pytest_asyncio.fixture
+async def temp_db(tmp_path):
+    await db_pool.close()
+    original_path = db_pool.path
+    db_pool.path = str(tmp_path / "films.db")
+    collection_cache.clear()
+    tfidf_indexes.clear()
+    name_indexes.clear()
+    await init_db()
+    yield db_pool
+    await db_pool.close()
+    collection_cache.clear()
+    tfidf_indexes.clear()
+    name_indexes.clear()
+    db_pool.path = original_path
+
+
+@pytest_asyncio.fixture
+async def fake_server(temp_db, monkeypatch):
+    servers = []
+
+    async def start(faults=None):
+        server = TestServer(create_app(Corpus.load(synthetic=50), faults))
+        await server.start_server()
+        monkeypatch.setattr(tmdb, "TMDB_API_URL", str(server.make_url("/3")))
+        servers.append(server)
+        return server
+
+    tmdb_cache.clear_memory()
+    yield start
+    await close_http_session()
+    for server in servers:
+        await server.close()
+    tmdb_cache.clear_memory()
@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.common import DummyMessage, DummyState
+from db import load_films, save_film
+from handlers.add import batch_via_tmdb
+
+
+@pytest.mark.asyncio
+async def test_batch_add_saves_matches_and_reports(fake_server):
+    await fake_server()
+    await save_film(1, {"name": "Heat", "rating": 8, "year": 1995})
+    message = DummyMessage("Inception\nHeat\n\nNo such film\nInception")
+
+    await batch_via_tmdb(message, DummyState({"batch_tag": "viewed"}))
+
+    films = await load_films(1)
+    assert films["Inception"]["tag"] == "viewed"
+    assert films["Heat"]["rating"] == 8
+    assert message.texts[0].startswith("Searching TMDb: 0/3")
+    assert message.edits[-1] == "Searched TMDb: found 2/3"
+    assert "Added 1 films" in message.texts[-1]
+    assert "Already in collection: Heat" in message.texts[-1]
+    assert "Not found: No such film" in message.texts[-1]
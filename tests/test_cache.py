@@ -0,0 +1,98 @@
+import pytest
+
+from cache import CollectionCache, collection_cache
+from db import delete_film, load_films, save_film
+
+
+def test_cache_hit_and_miss():
+    cache = CollectionCache(max_users=10, ttl=60, max_bytes=10**6)
+    assert cache.get(1) is None
+    cache.put(1, {"Heat": {"rating": 8}}, cache.version(1))
+    assert cache.get(1) == {"Heat": {"rating": 8}}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_returns_read_only_snapshots():
+    cache = CollectionCache(max_users=10, ttl=60, max_bytes=10**6)
+    films = {"Heat": {"rating": 8}}
+    cache.put(1, films, cache.version(1))
+    films["Heat"]["rating"] = 2
+    snapshot = cache.get(1)
+    with pytest.raises(TypeError):
+        snapshot["Heat"]["rating"] = 1
+    with pytest.raises(TypeError):
+        snapshot["Alien"] = {}
+
+    # Запис не змінює вже виданий знімок
+    cache.update_film(1, "Alien", {"rating": 9})
+    cache.remove_film(1, "Heat")
+    assert snapshot == {"Heat": {"rating": 8}}
+    assert cache.get(1) == {"Alien": {"rating": 9}}
+
+
+def test_cache_skips_stale_load():
+    cache = CollectionCache(max_users=10, ttl=60, max_bytes=10**6)
+    version = cache.begin_load(1)
+    cache.update_film(1, "Heat", {"rating": 8})
+    cache.put(1, {}, version)
+    cache.end_load(1)
+    assert cache.get(1) is None
+    assert cache.cached_version(1) is None
+
+    cache.put(1, {}, cache.version(1))
+    version = cache.cached_version(1)
+    cache.update_film(1, "Heat", {"rating": 8})
+    assert cache.cached_version(1) not in (None, version)
+
+
+def test_cache_versions_are_bounded():
+    cache = CollectionCache(max_users=2, ttl=60, max_bytes=10**6)
+    for user_id in range(100):
+        cache.update_film(user_id, "Heat", {"rating": 8})
+        version = cache.begin_load(user_id)
+        cache.put(user_id, {}, version)
+        cache.end_load(user_id)
+    cache.invalidate(99)
+    assert len(cache._versions) == 1
+    assert not cache._loading
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CollectionCache(max_users=2, ttl=60, max_bytes=10**6)
+    for user_id in (1, 2):
+        cache.put(user_id, {}, cache.version(user_id))
+    cache.get(1)
+    cache.put(3, {}, cache.version(3))
+    assert cache.get(2) is None
+    assert cache.get(1) == {}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_respects_memory_ceiling():
+    cache = CollectionCache(max_users=10, ttl=60, max_bytes=2000)
+    cache.put(1, {"A": {"description": "x" * 1500}}, cache.version(1))
+    cache.put(2, {"B": {"description": "y" * 1500}}, cache.version(2))
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    assert cache.stats()["bytes"] <= 2000
+
+
+def test_cache_expires_entries():
+    cache = CollectionCache(max_users=10, ttl=0, max_bytes=10**6)
+    cache.put(1, {}, cache.version(1))
+    assert cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_write_through(temp_db):
+    await save_film(1, {"name": "Heat", "rating": 8.0, "year": 1995})
+    assert "Heat" in await load_films(1)
+
+    hits = collection_cache.hits
+    await save_film(1, {"name": "Alien", "rating": 8.5, "year": 1979})
+    await delete_film(1, "Heat")
+    films = await load_films(1)
+    assert collection_cache.hits == hits + 1
+    assert list(films) == ["Alien"]
+    assert films["Alien"]["rating"] == 8.5
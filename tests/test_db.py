@@ -0,0 +1,214 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from cache import collection_cache
+from db import (
+    delete_film,
+    existing_film_names,
+    film_exists,
+    films_by_genre,
+    load_films,
+    rename_film,
+    save_film,
+    search_films_by_description,
+    suggest_film_names,
+    update_film_field,
+)
+
+
+def make_film(name, **fields):
+    film = {
+        "name": name,
+        "rating": 7.5,
+        "year": 2010,
+        "genre": "Drama",
+        "description": "A test film",
+        "tag": "viewed",
+        "review": None,
+        "poster_url": None,
+        "trailer": None,
+    }
+    film.update(fields)
+    return film
+
+
+@pytest.mark.asyncio
+async def test_pool_uses_wal(temp_db):
+    async with temp_db.reader() as db:
+        async with db.execute("PRAGMA journal_mode") as cursor:
+            (mode,) = await cursor.fetchone()
+    assert mode == "wal"
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connections(temp_db):
+    async with temp_db.writer() as first:
+        pass
+    async with temp_db.writer() as second:
+        pass
+    assert first is second
+
+
+@pytest.mark.asyncio
+async def test_save_and_load_films(temp_db):
+    assert await save_film(1, make_film("Inception", rating=9.0))
+    assert await save_film(1, make_film("Inception", rating=8.0))
+    assert await save_film(2, make_film("Heat"))
+
+    films = await load_films(1)
+    assert list(films) == ["Inception"]
+    assert films["Inception"]["rating"] == 8.0
+
+
+@pytest.mark.asyncio
+async def test_description_search_ranks_matches(temp_db):
+    await save_film(
+        1, make_film("Alien", description="A crew meets a deadly alien in space")
+    )
+    await save_film(1, make_film("Heat", description="A thief and a detective in LA"))
+    await save_film(2, make_film("Other", description="Space alien adventure"))
+
+    matched = await search_films_by_description(1, "alien space ship")
+    assert [name for _, name, _ in matched] == ["Alien"]
+    assert 0 < matched[0][0] < 1
+
+
+@pytest.mark.asyncio
+async def test_description_search_ignores_stop_words_and_weak_matches(temp_db):
+    await save_film(1, make_film("Alien", description="A crew meets an alien"))
+    await save_film(1, make_film("Heat", description="A thief and a detective"))
+
+    # Лише службові й короткі слова — шукати нічого
+    assert await search_films_by_description(1, "a an and the of") == []
+    # Одне спільне слово з п'яти — це ще не схожий опис
+    assert (
+        await search_films_by_description(1, "crew on a boat sails across ocean") == []
+    )
+
+    [(similarity, name, _)] = await search_films_by_description(
+        1, "A crew meets an alien"
+    )
+    assert (name, similarity) == ("Alien", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_description_index_follows_updates(temp_db):
+    await save_film(1, make_film("Heat", description="Bank robbery"))
+    await save_film(1, make_film("Heat", description="Кримінальна драма"))
+    assert await search_films_by_description(1, "robbery") == []
+    assert [name for _, name, _ in await search_films_by_description(1, "драма")] == [
+        "Heat"
+    ]
+
+    await delete_film(1, "Heat")
+    assert await search_films_by_description(1, "драма") == []
+    assert await search_films_by_description(1, "!!!") == []
+
+
+@pytest.mark.asyncio
+async def test_update_film_field_changes_one_column(temp_db):
+    await save_film(1, make_film("Heat", description="Bank robbery"))
+    await load_films(1)
+
+    assert await update_film_field(1, "Heat", "rating", 9.5)
+    assert await update_film_field(1, "Heat", "tag", "Not Viewed")
+    assert await update_film_field(1, "Heat", "genre", "Crime, Thriller")
+    assert await update_film_field(1, "Heat", "description", "Кримінальна драма")
+    assert not await update_film_field(1, "Missing", "rating", 5)
+
+    cached = (await load_films(1))["Heat"]
+    collection_cache.clear()
+    assert (await load_films(1))["Heat"] == cached
+    assert cached["rating"] == 9.5 and cached["tag"] == "Not Viewed"
+    assert [name for name, _ in await films_by_genre(1, "thriller")] == ["Heat"]
+    assert await films_by_genre(1, "drama") == []
+    assert [name for _, name, _ in await search_films_by_description(1, "драма")] == [
+        "Heat"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rename_film_is_atomic(temp_db):
+    await save_film(1, make_film("Heat", description="Bank robbery"))
+    await save_film(1, make_film("Alien"))
+    await load_films(1)
+
+    assert await rename_film(1, "Heat", "Heat (1995)")
+    assert not await rename_film(1, "Heat (1995)", "Alien")
+    assert not await rename_film(1, "Missing", "Other")
+
+    assert set(await load_films(1)) == {"Heat (1995)", "Alien"}
+    collection_cache.clear()
+    films = await load_films(1)
+    assert set(films) == {"Heat (1995)", "Alien"}
+    assert films["Heat (1995)"]["description"] == "Bank robbery"
+    assert [name for _, name, _ in await search_films_by_description(1, "bank")] == [
+        "Heat (1995)"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_existence_checks_and_delete_result(temp_db):
+    await save_film(1, make_film("Heat"))
+    await save_film(1, make_film("Alien"))
+    await save_film(2, make_film("Ronin"))
+
+    assert await film_exists(1, "Heat")
+    assert not await film_exists(1, "Ronin")
+    assert await existing_film_names(1, ["Heat", "Ronin", "Alien"]) == {
+        "Heat",
+        "Alien",
+    }
+    assert await existing_film_names(1, []) == set()
+
+    await load_films(1)
+    assert await delete_film(1, "Heat") is True
+    assert await delete_film(1, "Heat") is False
+    assert list(await load_films(1)) == ["Alien"]
+
+
+@pytest.mark.asyncio
+async def test_film_exists_uses_primary_key(temp_db):
+    async with temp_db.reader() as db:
+        async with db.execute(
+            "EXPLAIN QUERY PLAN SELECT 1 FROM films WHERE user_id = ? AND name = ?",
+            (1, "Heat"),
+        ) as cursor:
+            plan = " ".join(row[-1] for row in await cursor.fetchall())
+    assert "sqlite_autoindex_films_1" in plan
+
+
+@pytest.mark.asyncio
+async def test_suggestions_follow_writes(temp_db):
+    await save_film(1, make_film("Inception"))
+    await save_film(2, make_film("Interstellar"))
+    assert await suggest_film_names(1, "inceptoin") == ["Inception"]
+
+    # Індекс уже в пам'яті — далі його оновлюють самі записи
+    await save_film(1, make_film("Interstellar"))
+    await rename_film(1, "Inception", "Inception (2010)")
+    assert await suggest_film_names(1, "inception") == ["Inception (2010)"]
+    assert "Interstellar" in await suggest_film_names(1, "intersteller")
+
+    await delete_film(1, "Interstellar")
+    assert await suggest_film_names(1, "intersteller") == []
+    assert await suggest_film_names(3, "inception") == []
+
+
+@pytest.mark.asyncio
+async def test_name_index_built_during_write_is_not_cached(temp_db, monkeypatch):
+    await save_film(1, make_film("Inception"))
+    reader = temp_db.reader
+
+    @asynccontextmanager
+    async def reader_then_write():
+        # Фільм додається, коли назви вже прочитані, а індекс ще не збудований
+        async with reader() as db:
+            yield db
+        monkeypatch.setattr(temp_db, "reader", reader)
+        await save_film(1, make_film("Interstellar"))
+
+    monkeypatch.setattr(temp_db, "reader", reader_then_write)
+    assert await suggest_film_names(1, "inceptoin") == ["Inception"]
+    assert "Interstellar" in await suggest_film_names(1, "intersteller")
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import tmdb
+import utils
+from benchmarks.fake_tmdb import FAULTS, Faults
+from tmdb import tmdb_get
+from utils import search_tmdb_film, search_tmdb_films
+
+
+@pytest.mark.asyncio
+async def test_search_and_details_from_fixture(fake_server):
+    await fake_server()
+    title, film_data, _ = await search_tmdb_film("inception", "en")
+    assert title == "Inception"
+    assert film_data["year"] == "2010"
+    assert "Science Fiction" in film_data["genre"]
+    assert film_data["trailer"] == "https://www.youtube.com/watch?v=trailer27205"
+
+
+@pytest.mark.asyncio
+async def test_discover_genres_and_missing_movie(fake_server):
+    await fake_server()
+    status, data = await tmdb_get("/discover/movie", {"page": 2})
+    assert status == 200
+    assert data["page"] == 2 and len(data["results"]) == 20
+    status, data = await tmdb_get("/genre/movie/list", {})
+    assert {"id": 18, "name": "Drama"} in data["genres"]
+    status, data = await tmdb_get("/movie/1", {})
+    assert status == 404
+
+
+@pytest.mark.asyncio
+async def test_injected_rate_limits_are_retried(fake_server, monkeypatch):
+    monkeypatch.setattr(tmdb, "TMDB_MAX_RETRIES", 50)
+    server = await fake_server(Faults(rate_limit_rate=0.5, retry_after=0.01, seed=1))
+    title, _, _ = await search_tmdb_film("Heat", "en")
+    assert title == "Heat"
+    assert server.app[FAULTS].rate_limited > 0
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_reported(fake_server):
+    await fake_server(Faults(error_rate=1.0))
+    title, film_data, text = await search_tmdb_film("Heat", "en")
+    assert title is None and film_data is None
+    assert "TMDB" in text
+
+
+@pytest.mark.asyncio
+async def test_batch_search_runs_concurrently_within_limit(monkeypatch):
+    active = peak = 0
+
+    async def fake_search(name, user_language):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return (name.title(), {}, "") if name != "missing" else (None, None, "")
+
+    monkeypatch.setattr(utils, "search_tmdb_film", fake_search)
+    names = ["heat", "alien", "missing", "parasite", "inception"]
+    done = []
+
+    results = await search_tmdb_films(
+        names, "en", concurrency=2, on_done=lambda name, title: done.append(name)
+    )
+
+    assert peak == 2
+    assert [title for _, title, _ in results] == [
+        "Heat",
+        "Alien",
+        None,
+        "Parasite",
+        "Inception",
+    ]
+    assert sorted(done) == sorted(names)
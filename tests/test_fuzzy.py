@@ -0,0 +1,55 @@
+import random
+import time
+
+from fuzzy import NameIndex, trigrams
+
+NAMES = ["Inception", "Interstellar", "The Matrix", "The Matrix Reloaded", "Heat"]
+
+
+def test_trigrams_ignore_case_and_punctuation():
+    assert trigrams("The  Matrix!") == trigrams("the matrix")
+    assert "  t" in trigrams("The Matrix")
+
+
+def test_search_ranks_typos_and_partial_names():
+    index = NameIndex(NAMES)
+    assert index.search("Inceptoin")[0][0] == "Inception"
+    assert [name for name, _ in index.search("matrix")][:2] == [
+        "The Matrix",
+        "The Matrix Reloaded",
+    ]
+    assert index.search("zzz") == []
+    assert index.search("  !") == []
+
+
+def test_remove_and_rename_keep_postings_consistent():
+    index = NameIndex(NAMES)
+    index.remove("Heat")
+    index.rename("Inception", "Inception (2010)")
+    assert "Heat" not in index
+    assert index.search("heat") == []
+    assert index.search("inception")[0][0] == "Inception (2010)"
+    assert len(index) == len(NAMES) - 1
+
+
+def test_search_over_10k_names_is_fast():
+    rnd = random.Random(1)
+    words = "midnight river empire shadow garden signal winter harbor".split()
+    index = NameIndex(
+        f"{' '.join(rnd.sample(words, k=3)).title()} {i}" for i in range(10_000)
+    )
+    started = time.perf_counter()
+    for _ in range(20):
+        results = index.search("Midnigt Rivr Empire")
+    elapsed = (time.perf_counter() - started) / 20
+    assert results
+    assert elapsed < 0.05
+
+
+def test_rank_puts_prefixes_before_word_prefixes_and_typos():
+    index = NameIndex(NAMES + ["Matrix"])
+    assert index.rank("matrix")[:3] == ["Matrix", "The Matrix", "The Matrix Reloaded"]
+    assert index.rank("m") == ["Matrix", "The Matrix", "The Matrix Reloaded"]
+    assert index.rank("") == sorted(NAMES + ["Matrix"])
+    index.add("Mad Max")
+    assert "Mad Max" in index.rank("m")
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from benchmarks.common import DummyInlineQuery
+from db import save_film, save_films_bulk
+from handlers.inline import inline_search
+
+
+async def ask(query, offset="", user_id=1):
+    inline_query = DummyInlineQuery(query, offset, user_id)
+    await inline_search(inline_query)
+    [(results, kwargs)] = inline_query.answers
+    return results, kwargs
+
+
+@pytest.mark.asyncio
+async def test_inline_search_ranks_prefix_matches_first(temp_db):
+    for name in ("Heat", "The Matrix", "Matrix Reloaded", "Mad Max"):
+        await save_film(1, {"name": name, "rating": 8, "year": 1999})
+    await save_film(2, {"name": "Matrix", "rating": 5, "year": 1999})
+
+    results, kwargs = await ask("matr")
+    assert [result.title for result in results][:2] == [
+        "Matrix Reloaded",
+        "The Matrix",
+    ]
+    assert "Heat" not in [result.title for result in results]
+    assert kwargs["is_personal"]
+    assert kwargs["next_offset"] == ""
+    assert "<b>Matrix Reloaded</b>" in results[0].input_message_content.message_text
+
+    # Нове збереження одразу потрапляє в індекс у пам'яті
+    await save_film(1, {"name": "Matrix", "rating": 9, "year": 1999})
+    results, _ = await ask("matr")
+    assert results[0].title == "Matrix"
+    assert "9" in results[0].description
+
+
+@pytest.mark.asyncio
+async def test_inline_search_paginates_with_next_offset(temp_db):
+    await save_films_bulk(
+        1, ({"name": f"Film {i:02}", "rating": 7, "year": 2000} for i in range(45))
+    )
+    titles = []
+    offset = ""
+    while True:
+        results, kwargs = await ask("", offset)
+        titles += [result.title for result in results]
+        offset = kwargs["next_offset"]
+        if not offset:
+            break
+    assert titles == [f"Film {i:02}" for i in range(45)]
+    assert len({result.id for result in results}) == len(results)
+
+    results, kwargs = await ask("", "garbage")
+    assert results[0].title == "Film 00"
+
+
+@pytest.mark.asyncio
+async def test_inline_search_latency_on_10k_films(temp_db):
+    await save_films_bulk(
+        1,
+        (
+            {"name": f"Film {i} part {i % 7}", "rating": 7, "year": 2000}
+            for i in range(10_000)
+        ),
+        chunk_size=5000,
+    )
+    await ask("")
+    samples = []
+    # Як при наборі: кожна клавіша — новий запит
+    for query in ("f", "fi", "fil", "film", "film 1", "film 12", "flim 123", "part 3"):
+        started = time.perf_counter()
+        await ask(query)
+        samples.append(time.perf_counter() - started)
+    assert max(samples) < 0.1
@@ -0,0 +1,162 @@
+import pytest
+
+import handlers.inspect
+from benchmarks.common import DummyMessage, DummyState
+from db import SELECT_FILMS, _filter_sql, films_by_genre, films_by_tag, save_film
+from handlers.inspect import (
+    film_by_description,
+    film_by_genre,
+    film_by_name,
+    film_by_rating,
+    film_by_year,
+)
+
+
+async def add_films(user_id=1):
+    await save_film(
+        user_id,
+        {"name": "Heat", "rating": 8.0, "year": 1995, "genre": "Crime, Drama"},
+    )
+    await save_film(
+        user_id,
+        {"name": "Alien", "rating": 8.5, "year": "1979", "genre": "Horror"},
+    )
+    await save_film(
+        user_id,
+        {
+            "name": "Тіні",
+            "rating": 8.0,
+            "year": 1965,
+            "genre": "Драма",
+            "tag": "viewed",
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_film_by_rating(temp_db):
+    await add_films()
+    message = DummyMessage("8,0")
+    await film_by_rating(message, DummyState())
+    text = message.answers[0][0][0]
+    assert "Heat" in text and "Тіні" in text
+    assert "Alien" not in text
+
+
+@pytest.mark.asyncio
+async def test_film_by_year_matches_text_years(temp_db):
+    await add_films()
+    message = DummyMessage("1979")
+    await film_by_year(message, DummyState())
+    assert "Alien" in message.answers[0][0][0]
+
+
+@pytest.mark.asyncio
+async def test_film_by_year_rejects_invalid_input(temp_db):
+    state = DummyState()
+    state.state = "waiting"
+    message = DummyMessage("abc")
+    await film_by_year(message, state)
+    assert "valid numerical year" in message.answers[0][0][0]
+    assert state.state == "waiting"
+
+
+@pytest.mark.asyncio
+async def test_film_by_genre_is_case_insensitive(temp_db):
+    await add_films()
+    message = DummyMessage("DRAMA")
+    await film_by_genre(message, DummyState())
+    assert "Heat" in message.answers[0][0][0]
+
+    assert [name for name, _ in await films_by_genre(1, "драма")] == ["Тіні"]
+
+
+@pytest.mark.asyncio
+async def test_film_by_genre_without_films(temp_db):
+    message = DummyMessage("drama")
+    await film_by_genre(message, DummyState())
+    assert message.answers[0][0][0] == "No films added."
+
+
+@pytest.mark.asyncio
+async def test_film_by_description_without_matches(temp_db):
+    await save_film(1, {"name": "Heat", "rating": 8.0, "description": "A bank heist"})
+    message = DummyMessage("a movie about a dog")
+    await film_by_description(message, DummyState())
+    assert message.answers[0][0][0] == "No movies with this description."
+
+
+@pytest.mark.asyncio
+async def test_films_by_tag(temp_db):
+    await add_films()
+    assert [name for name, _ in await films_by_tag(1, "Viewed")] == ["Тіні"]
+    assert await films_by_tag(2, "viewed") == []
+
+
+async def filter_plan(db, kind, value):
+    # План саме того запиту, який будує код для фільтра
+    where, params = _filter_sql(kind, value)
+    async with db.execute(
+        f"EXPLAIN QUERY PLAN {SELECT_FILMS} WHERE f.user_id = ? AND {where} "
+        "ORDER BY f.rating DESC, f.name",
+        (1, *params),
+    ) as cursor:
+        return [row[-1] for row in await cursor.fetchall()]
+
+
+@pytest.mark.asyncio
+async def test_filters_use_indexes(temp_db):
+    async with temp_db.reader() as db:
+        tag_plan = await filter_plan(db, "tag", "viewed")
+        rating_plan = await filter_plan(db, "rating", 8.0)
+    assert any(
+        "idx_films_user_tag_rating_name (user_id=? AND tag_id=?)" in step
+        for step in tag_plan
+    )
+    assert any(
+        "idx_films_user_rating_name (user_id=? AND rating=?)" in step
+        for step in rating_plan
+    )
+    for plan in (tag_plan, rating_plan):
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+
+@pytest.mark.asyncio
+async def test_year_filter_scans_only_users_films_in_order(temp_db):
+    # Рік живе в movies, тож фільтр іде по фільмах користувача в порядку
+    # сортування, а рік перевіряється по первинному ключу movies
+    async with temp_db.reader() as db:
+        plan = await filter_plan(db, "year", 1995)
+    assert any("idx_films_user_rating_name (user_id=?)" in step for step in plan)
+    assert any("m USING INTEGER PRIMARY KEY" in step for step in plan)
+    assert not any("TEMP B-TREE" in step or step.startswith("SCAN") for step in plan)
+
+
+@pytest.mark.asyncio
+async def test_film_by_name_suggests_local_matches_before_tmdb(temp_db, monkeypatch):
+    await add_films()
+    tmdb_calls = []
+
+    async def fake_search(name, language_code=None):
+        tmdb_calls.append(name)
+        return None, None, None
+
+    monkeypatch.setattr(handlers.inspect, "search_tmdb_film", fake_search)
+    state = DummyState()
+
+    message = DummyMessage("alein")
+    await film_by_name(message, state)
+    ((_, kwargs),) = message.answers
+    buttons = [row[0].text for row in kwargs["reply_markup"].keyboard]
+    assert buttons[0] == "Alien"
+    assert "Search via TMDb" in buttons
+    assert tmdb_calls == []
+
+    message = DummyMessage("Alien")
+    await film_by_name(message, state)
+    assert "Alien" in message.answers[0][0][0]
+    assert state.state is None
+
+    await film_by_name(DummyMessage("alein"), state)
+    await film_by_name(DummyMessage("Search via TMDb"), state)
+    assert tmdb_calls == ["alein"]
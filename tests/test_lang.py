@@ -0,0 +1,61 @@
+import pytest
+
+import lang
+from lang import LanguageResolver, script_language
+
+
+def test_script_fast_path():
+    assert script_language("Inception") == "en"
+    assert script_language("Amélie") == "en"
+    assert script_language("Тіні забутих предків") == "uk"
+    assert script_language("Ёлки") == "ru"
+    assert script_language("Брат") is None
+    assert script_language("1917") == ""
+
+
+@pytest.mark.asyncio
+async def test_fast_path_skips_detector(monkeypatch):
+    def fail(text, seed):
+        raise AssertionError("detector must not run")
+
+    monkeypatch.setattr(lang, "_detect", fail)
+    resolver = LanguageResolver(cache_size=10, seed=0)
+    assert await resolver.resolve("The Matrix") == "en"
+    assert await resolver.resolve("Їжачок у тумані") == "uk"
+    assert await resolver.resolve("1917", language_code="uk") == "uk"
+    assert await resolver.resolve("Брат", language_code="ru") == "ru"
+    assert resolver.stats()["detector_calls"] == 0
+
+
+@pytest.mark.asyncio
+async def test_detector_results_are_cached(monkeypatch):
+    calls = []
+
+    def fake_detect(text, seed):
+        calls.append((text, seed))
+        return "bg"
+
+    monkeypatch.setattr(lang, "_detect", fake_detect)
+    resolver = LanguageResolver(cache_size=10, seed=7)
+    assert await resolver.resolve("Брат", language_code="en") == "bg"
+    assert await resolver.resolve("  БРАТ ", language_code="en") == "bg"
+    assert calls == [("брат", 7)]
+    assert resolver.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_detector_failure_falls_back_to_user_language(monkeypatch):
+    monkeypatch.setattr(lang, "_detect", lambda text, seed: "")
+    resolver = LanguageResolver(cache_size=10, seed=0)
+    assert await resolver.resolve("千と千尋", language_code="ja-JP") == "ja"
+    assert await resolver.resolve("千と千尋") == "en"
+
+
+@pytest.mark.asyncio
+async def test_real_detector_is_deterministic():
+    resolver = LanguageResolver(cache_size=10, seed=0)
+    results = set()
+    for _ in range(3):
+        resolver.clear()
+        results.add(await resolver.resolve("Брат старший идет домой по улице"))
+    assert len(results) == 1
@@ -0,0 +1,89 @@
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiohttp.test_utils import TestClient, TestServer
+
+from db import has_films_beyond, load_films
+from metrics import (
+    DB_QUERY_SECONDS,
+    HANDLER_SECONDS,
+    UPDATE_SECONDS,
+    Registry,
+    create_metrics_app,
+    instrument,
+)
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": 0,
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+        "text": "Inspect all films",
+    },
+}
+
+
+def test_histogram_renders_prometheus_text():
+    registry = Registry()
+    histogram = registry.histogram("demo_seconds", "Demo", buckets=(0.1, 1.0))
+    histogram.observe(0.05, endpoint="/movie/{id}")
+    histogram.observe(0.5, endpoint="/movie/{id}")
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{endpoint="/movie/{id}",le="0.1"} 1.0' in text
+    assert 'demo_seconds_bucket{endpoint="/movie/{id}",le="1.0"} 2.0' in text
+    assert 'demo_seconds_bucket{endpoint="/movie/{id}",le="+Inf"} 2.0' in text
+    assert 'demo_seconds_count{endpoint="/movie/{id}"} 2.0' in text
+
+
+@pytest.mark.asyncio
+async def test_middleware_times_handlers():
+    dp = Dispatcher()
+    router = Router(name="test")
+
+    @router.message()
+    async def inspect_all_films(message):
+        return None
+
+    dp.include_router(router)
+    instrument(dp, [router])
+    bot = Bot(token="123456:TEST")
+    before = HANDLER_SECONDS.count(router=__name__, handler="inspect_all_films")
+    await dp.feed_raw_update(bot, UPDATE)
+    await bot.session.close()
+    assert (
+        HANDLER_SECONDS.count(router=__name__, handler="inspect_all_films")
+        == before + 1
+    )
+    assert UPDATE_SECONDS.count(event="message", state="none") >= 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_queries(temp_db):
+    before = DB_QUERY_SECONDS.count(query="load_films")
+    await load_films(42)
+    assert DB_QUERY_SECONDS.count(query="load_films") == before + 1
+
+    client = TestClient(TestServer(create_metrics_app()))
+    await client.start_server()
+    try:
+        response = await client.get("/metrics")
+        text = await response.text()
+    finally:
+        await client.close()
+    assert response.status == 200
+    assert 'db_query_seconds_count{query="load_films"}' in text
+    assert 'cache_hit_ratio{cache="collection"}' in text
+    assert "# TYPE cache_requests_total counter" in text
+    assert 'cache_requests_total{cache="collection",result="miss"}' in text
+    assert "event_loop_lag_seconds" in text
+
+
+@pytest.mark.asyncio
+async def test_nested_queries_are_timed_once(temp_db):
+    films_page = DB_QUERY_SECONDS.count(query="films_page")
+    beyond = DB_QUERY_SECONDS.count(query="has_films_beyond")
+    await has_films_beyond(42, "all", "", None, "next")
+    assert DB_QUERY_SECONDS.count(query="has_films_beyond") == beyond + 1
+    assert DB_QUERY_SECONDS.count(query="films_page") == films_page
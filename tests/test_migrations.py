@@ -0,0 +1,150 @@
+import pytest
+
+from db import (
+    delete_film,
+    films_by_genre,
+    films_by_tag,
+    init_db,
+    load_films,
+    save_film,
+    search_films_by_description,
+    update_film_field,
+)
+from migrations import MIGRATIONS, migrate, schema_version
+
+TMDB_FILM = {
+    "tmdb_id": 949,
+    "name": "Heat",
+    "rating": 7.9,
+    "year": "1995",
+    "genre": "Action, Crime, Drama",
+    "description": "A group of high-end professional thieves start to feel the heat.",
+    "tag": "viewed",
+    "review": None,
+    "poster_url": "https://image.tmdb.org/t/p/w500/heat.jpg",
+    "trailer": None,
+}
+
+
+async def count(db_pool, sql, params=()):
+    async with db_pool.reader() as db:
+        async with db.execute(sql, params) as cursor:
+            (value,) = await cursor.fetchone()
+    return value
+
+
+@pytest.mark.asyncio
+async def test_new_database_is_at_latest_version(temp_db):
+    async with temp_db.writer() as db:
+        assert await schema_version(db) == MIGRATIONS[-1][0]
+        # Повторний запуск нічого не робить
+        assert await migrate(db) == MIGRATIONS[-1][0]
+
+
+@pytest.mark.asyncio
+async def test_legacy_films_are_migrated(tmp_path):
+    from db_pool import db_pool
+
+    await db_pool.close()
+    original_path = db_pool.path
+    db_pool.path = str(tmp_path / "legacy.db")
+    try:
+        async with db_pool.writer() as db:
+            await migrate(db, MIGRATIONS[:1])
+            await db.executemany(
+                "INSERT INTO films (user_id, name, rating, year, genre, description, "
+                "tag, review, poster_url, trailer, genre_norm) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        1,
+                        "Heat",
+                        8.0,
+                        1995,
+                        "Crime, Drama",
+                        "Bank robbery",
+                        "Viewed",
+                        "like",
+                        None,
+                        None,
+                        "crime, drama",
+                    ),
+                    (
+                        2,
+                        "Alien",
+                        9.0,
+                        1979,
+                        "Horror",
+                        "Space crew",
+                        "viewed",
+                        None,
+                        None,
+                        None,
+                        "horror",
+                    ),
+                ],
+            )
+            await db.commit()
+
+        await init_db()
+
+        films = await load_films(1)
+        assert films["Heat"]["genre"] == "Crime, Drama"
+        assert films["Heat"]["review"] == "like"
+        assert [name for name, _ in await films_by_genre(1, "drama")] == ["Heat"]
+        assert [name for name, _ in await films_by_tag(2, "VIEWED")] == ["Alien"]
+        assert [
+            name for _, name, _ in await search_films_by_description(1, "bank")
+        ] == ["Heat"]
+        assert await count(db_pool, "SELECT count(*) FROM tags") == 1
+    finally:
+        await db_pool.close()
+        db_pool.path = original_path
+
+
+@pytest.mark.asyncio
+async def test_tmdb_films_share_one_catalog_row(temp_db):
+    await save_film(1, TMDB_FILM)
+    await save_film(2, {**TMDB_FILM, "rating": 9.0, "tag": "not viewed"})
+
+    assert await count(temp_db, "SELECT count(*) FROM movies") == 1
+    assert await count(temp_db, "SELECT count(*) FROM movie_genres") == 3
+    assert (await load_films(2))["Heat"]["rating"] == 9.0
+
+    # Зміна поля користувача (без tmdb_id, як з edit) не відриває фільм від каталогу
+    edited = {**(await load_films(1))["Heat"], "name": "Heat", "rating": 5}
+    await save_film(1, edited)
+    assert await count(temp_db, "SELECT count(*) FROM movies") == 1
+
+
+@pytest.mark.asyncio
+async def test_editing_shared_data_makes_a_private_copy(temp_db):
+    await save_film(1, TMDB_FILM)
+    await save_film(2, TMDB_FILM)
+
+    await save_film(1, {**TMDB_FILM, "tmdb_id": None, "description": "Мій опис"})
+
+    assert (await load_films(1))["Heat"]["description"] == "Мій опис"
+    assert (await load_films(2))["Heat"]["description"] == TMDB_FILM["description"]
+    assert await search_films_by_description(2, "опис") == []
+    assert [name for _, name, _ in await search_films_by_description(1, "опис")] == [
+        "Heat"
+    ]
+
+    # Власна копія видаляється разом із фільмом, спільний рядок лишається
+    await delete_film(1, "Heat")
+    assert await count(temp_db, "SELECT count(*) FROM movies") == 1
+    assert await count(temp_db, "SELECT count(*) FROM movies WHERE tmdb_id = 949") == 1
+
+
+@pytest.mark.asyncio
+async def test_field_update_on_shared_film_copies_it(temp_db):
+    await save_film(1, TMDB_FILM)
+    await save_film(2, TMDB_FILM)
+
+    assert await update_film_field(1, "Heat", "genre", "Thriller")
+
+    assert await count(temp_db, "SELECT count(*) FROM movies") == 2
+    assert [name for name, _ in await films_by_genre(1, "thriller")] == ["Heat"]
+    assert await films_by_genre(2, "thriller") == []
+    assert (await load_films(2))["Heat"]["genre"] == TMDB_FILM["genre"]
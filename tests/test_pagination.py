@@ -0,0 +1,114 @@
+import pytest
+
+from benchmarks.common import DummyMessage
+from db import save_film
+from handlers.inspect import films_page_handler
+from pagination import MESSAGE_LIMIT, FilmsPage, build_page, short_value
+
+
+async def add_many(count, user_id=1):
+    for i in range(count):
+        await save_film(
+            user_id,
+            {
+                "name": f"Film {i:02d}",
+                "rating": 10 - i % 5,
+                "year": 2000,
+                "genre": "Drama",
+                "description": "x" * 450,
+                "tag": "viewed",
+            },
+        )
+
+
+def page_names(text):
+    return [
+        line.split("<b>")[1].split("</b>")[0]
+        for line in text.split("\n")
+        if "🎬" in line
+    ]
+
+
+def callbacks(markup):
+    if markup is None:
+        return {}
+    return {
+        FilmsPage.unpack(button.callback_data).direction: FilmsPage.unpack(
+            button.callback_data
+        )
+        for button in markup.inline_keyboard[0]
+    }
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_collection_in_order(temp_db):
+    await add_many(30)
+    seen = []
+    page = await build_page(1, "all", "")
+    pages = 0
+    while True:
+        text, markup, count = page
+        assert len(text) <= MESSAGE_LIMIT
+        assert count == len(page_names(text))
+        seen += page_names(text)
+        pages += 1
+        buttons = callbacks(markup)
+        if "next" not in buttons:
+            break
+        data = buttons["next"]
+        page = await build_page(1, data.kind, data.value, data.cursor, data.direction)
+
+    expected = sorted(
+        (f"Film {i:02d}" for i in range(30)),
+        key=lambda name: (-(10 - int(name[-2:]) % 5), name),
+    )
+    assert seen == expected
+    assert pages > 1
+
+
+@pytest.mark.asyncio
+async def test_prev_returns_to_previous_page(temp_db):
+    await add_many(30)
+    first_text, first_markup, _ = await build_page(1, "all", "")
+    assert "prev" not in callbacks(first_markup)
+
+    data = callbacks(first_markup)["next"]
+    _, second_markup, _ = await build_page(
+        1, data.kind, data.value, data.cursor, data.direction
+    )
+    data = callbacks(second_markup)["prev"]
+    text, markup, _ = await build_page(
+        1, data.kind, data.value, data.cursor, data.direction
+    )
+    assert page_names(text) == page_names(first_text)
+    assert "prev" not in callbacks(markup)
+
+
+@pytest.mark.asyncio
+async def test_filtered_single_page_has_no_buttons(temp_db):
+    await add_many(10)
+    text, markup, count = await build_page(1, "rating", 9.0)
+    assert page_names(text) == ["Film 01", "Film 06"]
+    assert markup is None
+    assert await build_page(1, "genre", "comedy") is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_callback_data_answers_no_movies(temp_db):
+    await add_many(3)
+    assert await build_page(1, "bogus", "x") is None
+    assert await build_page(1, "rating", "") is None
+    assert await build_page(1, "year", "abc") is None
+
+    callback = DummyMessage()
+    callback.message = DummyMessage()
+    data = FilmsPage(kind="rating", value="", cursor=1, direction="next")
+    await films_page_handler(callback, data)
+    assert callback.texts == ["No movies."]
+    assert callback.message.edits == []
+
+
+def test_short_value_fits_callback_data():
+    value = short_value("Драма: дуже довгий жанр для кнопки")
+    assert len(value.encode("utf-8")) <= 24
+    FilmsPage(kind="genre", value=value, cursor=10**9, direction="next").pack()
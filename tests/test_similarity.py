@@ -0,0 +1,107 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from cache import collection_cache
+from db import delete_film, load_films, save_film
+from similarity import TfidfIndex, tfidf_indexes
+from utils import find_similar_films_by_description
+
+FILMS = {
+    "Alien": {"description": "A spaceship crew is hunted by a deadly alien"},
+    "Heat": {"description": "A detective chases a professional bank robber"},
+    "Тіні": {"description": "Гуцульська трагедія кохання в Карпатах"},
+}
+
+
+def test_tfidf_ranks_closest_description_first():
+    matched = find_similar_films_by_description(
+        "crew hunted by alien", FILMS, threshold=0.1, engine="tfidf"
+    )
+    assert matched[0][1] == "Alien"
+    assert matched[0][2] is FILMS["Alien"]
+    assert 0 < matched[0][0] <= 1
+
+
+def test_tfidf_tolerates_typos_and_cyrillic():
+    index = TfidfIndex.from_films(FILMS)
+    assert index.search("трагедiя коханя", threshold=0.1)[0][1] == "Тіні"
+    assert index.search("zzzz") == []
+
+
+def test_tfidf_incremental_updates():
+    index = TfidfIndex.from_films(FILMS)
+    index.search("bank robber")
+    index.add("Heat", "Space opera")
+    index.remove("Alien")
+    index.add("Ronin", "A professional bank robber job in Paris")
+
+    assert len(index) == 3
+    names = [name for _, name in index.search("bank robber", threshold=0.1)]
+    assert names[0] == "Ronin"
+    assert "Heat" not in names
+    assert "Alien" not in [name for _, name in index.search("alien crew")]
+
+
+def test_tfidf_rename_keeps_vector():
+    index = TfidfIndex.from_films(FILMS)
+    before = index.search("bank robber")
+    index.rename("Heat", "Heat (1995)")
+
+    after = index.search("bank robber")
+    assert [score for score, _ in after] == [score for score, _ in before]
+    assert "Heat (1995)" in [name for _, name in after]
+    assert "Heat" not in [name for _, name in after]
+
+
+def test_tfidf_top_n():
+    films = {f"Film {i}": {"description": f"robot story {i}"} for i in range(20)}
+    matched = find_similar_films_by_description(
+        "robot story", films, threshold=0.0, top_n=5, engine="tfidf"
+    )
+    assert len(matched) == 5
+
+
+def test_difflib_engine_is_default():
+    matched = find_similar_films_by_description(
+        "a detective chases a bank robber", FILMS
+    )
+    assert matched[0][1] == "Heat"
+
+
+@pytest.mark.asyncio
+async def test_registry_follows_save_film(temp_db):
+    await save_film(1, {"name": "Alien", "description": "deadly alien in space"})
+    films = await load_films(1)
+    find_similar_films_by_description("alien", films, engine="tfidf", user_id=1)
+
+    await save_film(1, {"name": "Heat", "description": "bank robber in LA"})
+    await delete_film(1, "Alien")
+    index = tfidf_indexes.get(1, {}, collection_cache.cached_version(1))
+    assert [name for _, name in index.search("bank robber")] == ["Heat"]
+    assert index.search("deadly alien") == []
+
+
+@pytest.mark.asyncio
+async def test_registry_skips_collection_read_during_write(temp_db, monkeypatch):
+    await save_film(1, {"name": "Alien", "description": "deadly alien in space"})
+    reader = temp_db.reader
+
+    @asynccontextmanager
+    async def reader_then_write():
+        # Фільм додається, коли колекцію вже прочитано, а індексу ще немає
+        async with reader() as db:
+            yield db
+        monkeypatch.setattr(temp_db, "reader", reader)
+        await save_film(1, {"name": "Heat", "description": "bank robber in LA"})
+
+    monkeypatch.setattr(temp_db, "reader", reader_then_write)
+    stale = await load_films(1)
+    assert list(stale) == ["Alien"]
+    find_similar_films_by_description("alien", stale, engine="tfidf", user_id=1)
+
+    films = await load_films(1)
+    matched = find_similar_films_by_description(
+        "bank robber", films, engine="tfidf", user_id=1
+    )
+    assert [name for _, name, _ in matched] == ["Heat"]
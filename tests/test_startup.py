@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+from lazy import ensure_loaded, lazy_import
+from startup_profile import profile_imports
+
+
+def test_lazy_import_defers_loading(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = lazy_import("colorsys")
+    assert type(module).__name__ == "_LazyModule"
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert type(module).__name__ == "module"
+
+
+def test_ensure_loaded_finishes_lazy_import(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    lazy_import("colorsys")
+    module = ensure_loaded("colorsys")
+    assert type(module).__name__ == "module"
+
+
+def test_profile_imports_reports_direct_imports():
+    report = profile_imports("json")
+    assert report["total_ms"] > 0
+    names = {row["module"] for row in report["imports"]}
+    assert "json.decoder" in names
+    assert all(row["depth"] == 1 for row in report["imports"])
+
+
+def test_bot_import_does_not_load_aiohttp_web():
+    # aiohttp.web потрібен лише в режимі webhook або для сервера метрик
+    code = (
+        "import sys, config; config.TOKEN = '123456:TEST'; import bot; "
+        "print('aiohttp.web' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_numpy_warm_up_runs_on_event_loop_thread():
+    # LazyLoader не потокобезпечний, тож NumPy не довантажується в executor
+    code = """
+import asyncio, threading, config
+config.TOKEN = "123456:TEST"
+import bot
+threads = []
+bot.load_detector = lambda: None
+bot.ensure_loaded = lambda name: threads.append((name, threading.current_thread()))
+
+async def main():
+    await bot.on_startup()
+    await asyncio.sleep(0.1)
+
+asyncio.run(main())
+print(threads == [("numpy", threading.main_thread())])
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "True"
@@ -0,0 +1,114 @@
+import time
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from states import AddFilmsState
+from storage import SQLiteStorage
+
+KEY = StorageKey(bot_id=1, chat_id=42, user_id=42)
+
+
+async def count_rows(pool):
+    async with pool.reader() as db:
+        async with db.execute("SELECT COUNT(*) FROM fsm_storage") as cursor:
+            return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_state_survives_restart(temp_db):
+    storage = SQLiteStorage(flush_interval=60)
+    await storage.set_state(KEY, AddFilmsState.waiting_for_rating)
+    await storage.update_data(KEY, {"film_name": "Heat"})
+    assert await count_rows(temp_db) == 0
+    await storage.close()
+
+    restarted = SQLiteStorage()
+    assert await restarted.get_state(KEY) == AddFilmsState.waiting_for_rating.state
+    assert await restarted.get_data(KEY) == {"film_name": "Heat"}
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched(temp_db):
+    storage = SQLiteStorage(flush_interval=60)
+    for user_id in range(10):
+        key = StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)
+        await storage.set_state(key, AddFilmsState.waiting_for_name)
+    assert storage.stats()["dirty"] == 10
+    await storage.flush()
+    assert storage.stats()["dirty"] == 0
+    assert await count_rows(temp_db) == 10
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_cleared_state_is_deleted(temp_db):
+    storage = SQLiteStorage(flush_interval=60)
+    await storage.set_state(KEY, AddFilmsState.waiting_for_name)
+    await storage.flush()
+    await storage.set_state(KEY, None)
+    await storage.set_data(KEY, {})
+    await storage.flush()
+    assert await count_rows(temp_db) == 0
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_state_expires(temp_db):
+    storage = SQLiteStorage(ttl=60, flush_interval=60)
+    await storage.set_state(KEY, AddFilmsState.waiting_for_name)
+    await storage.flush()
+    storage._records[next(iter(storage._records))].expires_at = time.time() - 1
+    assert await storage.get_state(KEY) is None
+    await storage.close()
+    assert await count_rows(temp_db) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_data_returns_copy(temp_db):
+    storage = SQLiteStorage(flush_interval=60)
+    await storage.set_data(KEY, {"rating": 8})
+    data = await storage.get_data(KEY)
+    data["rating"] = 1
+    assert await storage.get_data(KEY) == {"rating": 8}
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_other_process_changes_are_picked_up(temp_db):
+    # Два екземпляри зі спільною базою — як кілька webhook-серверів
+    first = SQLiteStorage(flush_interval=60, recheck_interval=0)
+    second = SQLiteStorage(flush_interval=60, recheck_interval=0)
+    await first.set_state(KEY, AddFilmsState.waiting_for_name)
+    await first.flush()
+    assert await second.get_state(KEY) == AddFilmsState.waiting_for_name.state
+
+    await second.set_state(KEY, AddFilmsState.waiting_for_rating)
+    await second.update_data(KEY, {"film_name": "Heat"})
+    # Поки зміни не записані, перший бачить свою копію
+    assert await first.get_state(KEY) == AddFilmsState.waiting_for_name.state
+    await second.flush()
+    assert await first.get_state(KEY) == AddFilmsState.waiting_for_rating.state
+    assert await first.get_data(KEY) == {"film_name": "Heat"}
+
+    await second.set_state(KEY, None)
+    await second.set_data(KEY, {})
+    await second.flush()
+    assert await first.get_state(KEY) is None
+    assert await first.get_data(KEY) == {}
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_state_is_not_rechecked_within_interval(temp_db):
+    first = SQLiteStorage(flush_interval=60, recheck_interval=60)
+    second = SQLiteStorage(flush_interval=60)
+    await first.set_state(KEY, AddFilmsState.waiting_for_name)
+    await first.flush()
+    await second.set_state(KEY, AddFilmsState.waiting_for_rating)
+    await second.flush()
+    assert await first.get_state(KEY) == AddFilmsState.waiting_for_name.state
+    await first.close()
+    await second.close()
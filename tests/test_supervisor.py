@@ -0,0 +1,79 @@
+import asyncio
+import queue
+
+import pytest
+
+from supervisor import UpdateRouter, shard_for, update_user_id
+from webhook import UpdateRunner
+
+
+def message_update(update_id, user_id):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": "Add film",
+        },
+    }
+
+
+def test_update_user_id_from_different_events():
+    assert update_user_id(message_update(1, 42)) == 42
+    callback = {
+        "update_id": 2,
+        "callback_query": {"id": "1", "from": {"id": 7}, "data": "films:all"},
+    }
+    assert update_user_id(callback) == 7
+    poll_answer = {"update_id": 3, "poll_answer": {"user": {"id": 9}}}
+    assert update_user_id(poll_answer) == 9
+    channel_post = {"update_id": 4, "channel_post": {"chat": {"id": -100}}}
+    assert update_user_id(channel_post) == -100
+    assert update_user_id({"update_id": 5}) is None
+
+
+def test_same_user_always_goes_to_same_worker():
+    shards = {shard_for(message_update(i, 42), 4) for i in range(20)}
+    assert len(shards) == 1
+    spread = {shard_for(message_update(1, user_id), 4) for user_id in range(20)}
+    assert spread == {0, 1, 2, 3}
+
+
+def test_router_keeps_per_user_order():
+    queues = [queue.Queue() for _ in range(3)]
+    router = UpdateRouter(queues)
+    for update_id in range(10):
+        router.route(message_update(update_id, 42 + update_id % 2))
+    delivered = {}
+    for worker in queues:
+        while not worker.empty():
+            data = worker.get()
+            user_id = update_user_id(data)
+            delivered.setdefault(user_id, []).append(data["update_id"])
+    assert delivered[42] == [0, 2, 4, 6, 8]
+    assert delivered[43] == [1, 3, 5, 7, 9]
+
+
+@pytest.mark.asyncio
+async def test_worker_handles_each_users_updates_in_order():
+    started = []
+    finished = []
+
+    async def handle_update(data):
+        started.append(data["update_id"])
+        # Перший апдейт користувача обробляється найдовше
+        await asyncio.sleep(0.05 if data["update_id"] == 0 else 0)
+        finished.append(data["update_id"])
+
+    runner = UpdateRunner(handle_update, max_concurrency=10)
+    for update_id in range(3):
+        await runner.submit(message_update(update_id, 42))
+    await runner.submit(message_update(3, 7))
+    await runner.drain()
+    assert [i for i in finished if i != 3] == [0, 1, 2]
+    # Інший користувач не чекає на повільний апдейт
+    assert finished.index(3) < finished.index(0)
+    assert runner.in_flight == 0
+    assert not runner._tails
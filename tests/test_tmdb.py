@@ -0,0 +1,226 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import tmdb
+from http_client import close_http_session, get_http_session
+from metrics import TMDB_REQUEST_SECONDS
+from tmdb import TokenBucket, _retry_delay, tmdb_latency
+from tmdb_cache import cache_key, tmdb_cache
+from utils import search_tmdb_film
+
+MOVIE = {
+    "id": 27205,
+    "title": "Inception",
+    "release_date": "2010-07-15",
+    "genres": [{"id": 28, "name": "Action"}],
+    "vote_average": 8.368,
+    "overview": "A thief who steals corporate secrets.",
+    "poster_path": "/poster.jpg",
+}
+
+VIDEOS = {
+    "results": [
+        {"type": "Teaser", "site": "YouTube", "key": "teaser", "iso_639_1": "en"},
+        {"type": "Trailer", "site": "YouTube", "key": "uk", "iso_639_1": "uk"},
+        {"type": "Trailer", "site": "YouTube", "key": "abc", "iso_639_1": "en"},
+    ]
+}
+
+
+class FakeCalls(list):
+    def __init__(self):
+        super().__init__()
+        self.peers = []
+        self.append_videos = True
+        self.latency = 0
+        self.rate_limited = 0
+
+    def record(self, request):
+        self.append(request.path)
+        self.peers.append(request.transport.get_extra_info("peername"))
+
+
+@pytest_asyncio.fixture
+async def fake_tmdb(temp_db, monkeypatch):
+    calls = FakeCalls()
+
+    async def search(request):
+        calls.record(request)
+        await asyncio.sleep(calls.latency)
+        if calls.rate_limited:
+            calls.rate_limited -= 1
+            return web.json_response(
+                {"status_code": 25}, status=429, headers={"Retry-After": "0.05"}
+            )
+        found = request.query["query"].lower() == "inception"
+        return web.json_response({"results": [MOVIE] if found else []})
+
+    async def details(request):
+        calls.record(request)
+        if calls.append_videos and request.query.get("append_to_response") == "videos":
+            return web.json_response({**MOVIE, "videos": VIDEOS})
+        return web.json_response(MOVIE)
+
+    async def videos(request):
+        calls.record(request)
+        return web.json_response(VIDEOS)
+
+    app = web.Application()
+    app.router.add_get("/search/movie", search)
+    app.router.add_get("/movie/{id}", details)
+    app.router.add_get("/movie/{id}/videos", videos)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(tmdb, "TMDB_API_URL", str(server.make_url("")).rstrip("/"))
+    tmdb_cache.clear_memory()
+    yield calls
+    tmdb_cache.clear_memory()
+    await close_http_session()
+    await server.close()
+
+
+def test_cache_key_ignores_api_key():
+    assert cache_key("/search/movie", {"api_key": "1", "query": "x"}) == cache_key(
+        "/search/movie", {"query": "x", "api_key": "2"}
+    )
+    assert cache_key("/search/movie", {"query": "x", "language": "en-US"}) != (
+        cache_key("/search/movie", {"query": "x", "language": "uk-UA"})
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_is_cached(fake_tmdb):
+    title, film_data, _ = await search_tmdb_film("Inception", "en")
+    assert title == "Inception"
+    assert film_data["trailer"] == "https://www.youtube.com/watch?v=abc"
+    assert len(fake_tmdb) == 2
+
+    assert (await search_tmdb_film("Inception", "en"))[1] == film_data
+    assert len(fake_tmdb) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_survives_restart(fake_tmdb):
+    await search_tmdb_film("Inception", "en")
+    tmdb_cache.clear_memory()
+    disk_hits = tmdb_cache.disk_hits
+
+    title, _, _ = await search_tmdb_film("Inception", "en")
+    assert title == "Inception"
+    assert len(fake_tmdb) == 2
+    assert tmdb_cache.disk_hits == disk_hits + 2
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_cached(fake_tmdb):
+    assert (await search_tmdb_film("Unknown", "en"))[2] == "Фільм не знайдено."
+    assert (await search_tmdb_film("Unknown", "en"))[2] == "Фільм не знайдено."
+    assert fake_tmdb == ["/search/movie"]
+    assert tmdb_cache.ttl_for("/search/movie", 200, {"results": []}) == (
+        tmdb_cache.negative_ttl
+    )
+    assert tmdb_cache.ttl_for("/movie/27205/videos", 200, MOVIE) == (
+        tmdb_cache.ttls["/movie/{id}/videos"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_one_connection(fake_tmdb):
+    session = get_http_session()
+    await search_tmdb_film("Inception", "en")
+    assert get_http_session() is session
+    # Усі три запити пішли через одне keep-alive з'єднання
+    assert len(set(fake_tmdb.peers)) == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_is_two_round_trips(fake_tmdb):
+    tmdb_latency.clear()
+    await search_tmdb_film("Inception", "uk")
+    assert fake_tmdb == ["/search/movie", "/movie/27205"]
+    summary = tmdb_latency.summary()
+    assert {"search", "details", "lookup"} <= set(summary)
+    assert summary["lookup"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_videos_fallback_without_append(fake_tmdb):
+    fake_tmdb.append_videos = False
+    _, film_data, _ = await search_tmdb_film("Inception", "en")
+    assert fake_tmdb == ["/search/movie", "/movie/27205", "/movie/27205/videos"]
+    assert film_data["trailer"] == "https://www.youtube.com/watch?v=abc"
+
+
+@pytest.mark.asyncio
+async def test_parallel_details_and_videos(fake_tmdb, monkeypatch):
+    monkeypatch.setattr(tmdb, "TMDB_APPEND_TO_RESPONSE", False)
+    _, film_data, _ = await search_tmdb_film("Inception", "en")
+    assert sorted(fake_tmdb[1:]) == ["/movie/27205", "/movie/27205/videos"]
+    assert film_data["trailer"] == "https://www.youtube.com/watch?v=abc"
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_coalesced(fake_tmdb):
+    fake_tmdb.latency = 0.05
+    results = await asyncio.gather(
+        *(search_tmdb_film("Inception", "en") for _ in range(10))
+    )
+    assert {title for title, _, _ in results} == {"Inception"}
+    assert fake_tmdb.count("/search/movie") == 1
+    assert fake_tmdb.count("/movie/27205") == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_response_is_retried(fake_tmdb):
+    fake_tmdb.rate_limited = 2
+    started = time.monotonic()
+    title, _, _ = await search_tmdb_film("Inception", "en")
+    assert title == "Inception"
+    assert fake_tmdb.count("/search/movie") == 3
+    assert time.monotonic() - started >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_requests_are_timed_by_endpoint_and_status(fake_tmdb):
+    fake_tmdb.rate_limited = 1
+    ok = TMDB_REQUEST_SECONDS.count(endpoint="/search/movie", status="200")
+    limited = TMDB_REQUEST_SECONDS.count(endpoint="/search/movie", status="429")
+    await search_tmdb_film("Inception", "en")
+    assert TMDB_REQUEST_SECONDS.count(endpoint="/search/movie", status="200") == ok + 1
+    assert (
+        TMDB_REQUEST_SECONDS.count(endpoint="/search/movie", status="429")
+        == limited + 1
+    )
+    assert TMDB_REQUEST_SECONDS.count(endpoint="/movie/{id}", status="200") >= 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_gives_up_after_max_retries(fake_tmdb, monkeypatch):
+    monkeypatch.setattr(tmdb, "TMDB_MAX_RETRIES", 1)
+    fake_tmdb.rate_limited = 5
+    title, _, text = await search_tmdb_film("Inception", "en")
+    assert title is None
+    assert "Помилка" in text
+    assert fake_tmdb.count("/search/movie") == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles():
+    bucket = TokenBucket(rate=50, burst=2)
+    started = time.monotonic()
+    for _ in range(7):
+        await bucket.acquire()
+    # Два токени є одразу, решта п'ять — по 20 мс
+    assert time.monotonic() - started >= 0.09
+
+
+def test_retry_delay():
+    assert _retry_delay("2", 0) == 2
+    assert _retry_delay(None, 2) == tmdb.TMDB_RETRY_BACKOFF * 4
+    assert _retry_delay("1000", 0) == tmdb.TMDB_RETRY_MAX_DELAY
+    assert _retry_delay("Wed, 21 Oct 2015 07:28:00 GMT", 0) == 0
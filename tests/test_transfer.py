@@ -0,0 +1,169 @@
+import io
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import transfer
+from benchmarks.common import DummyMessage, DummyState
+from db import load_films, save_film, save_films_bulk
+from handlers.transfer import import_file
+from states import TransferState
+from transfer import ImportReport, detect_format, export_chunks, iter_rows
+from utils import validate_film_row
+
+FILM = {
+    "name": "Тіні забутих предків",
+    "rating": 9.0,
+    "year": 1965,
+    "genre": "Drama",
+    "description": "Гуцульська легенда, 'лапки' та кома, тут",
+    "tag": "viewed",
+    "review": "like",
+    "poster_url": None,
+    "trailer": "https://example.com/trailer",
+}
+
+
+async def export_bytes(user_id, fmt):
+    return b"".join([chunk async for chunk in export_chunks(user_id, fmt)])
+
+
+async def import_bytes(user_id, data, filename):
+    report = ImportReport()
+    stream = io.BytesIO(data)
+    fmt = detect_format(filename, data[:64])
+    saved = await save_films_bulk(user_id, report.films(iter_rows(stream, fmt)))
+    return saved, report
+
+
+def test_validate_film_row():
+    valid, film = validate_film_row(
+        {"name": " Heat ", "rating": "8,5", "year": "1995", "tag": "Viewed"}
+    )
+    assert valid
+    assert film["name"] == "Heat"
+    assert film["rating"] == 8.5
+    assert film["tag"] == "viewed"
+    assert film["genre"] == ""
+
+    assert not validate_film_row({"name": "", "rating": 5, "year": 2000})[0]
+    assert not validate_film_row({"name": "X", "rating": 11, "year": 2000})[0]
+    assert not validate_film_row({"name": "X", "rating": 5, "year": 1700})[0]
+    assert not validate_film_row({"name": "X", "rating": "bad", "year": 2000})[0]
+    assert not validate_film_row(
+        {"name": "X", "rating": 5, "year": 2000, "tag": "maybe"}
+    )[0]
+    valid, film = validate_film_row(
+        {"name": "X", "rating": 5, "year": 2000, "poster_url": "ftp://x"}
+    )
+    assert valid and film["poster_url"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+async def test_export_import_round_trip(temp_db, fmt):
+    await save_film(1, FILM)
+    await save_film(1, {**FILM, "name": "Heat", "tag": None, "review": None})
+    data = await export_bytes(1, fmt)
+
+    saved, report = await import_bytes(2, data, f"films.{fmt}")
+
+    assert saved == 2
+    assert report.skipped == 0 and report.failure is None
+    assert await load_films(2) == await load_films(1)
+
+
+@pytest.mark.asyncio
+async def test_export_empty_collection_is_valid_json(temp_db):
+    assert json.loads(await export_bytes(1, "json")) == []
+
+
+@pytest.mark.asyncio
+async def test_json_objects_split_across_chunks(temp_db, monkeypatch):
+    monkeypatch.setattr(transfer, "READ_CHUNK_SIZE", 7)
+    rows = [{**FILM, "name": f"Film {i}"} for i in range(20)]
+    data = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows).encode()
+
+    saved, report = await import_bytes(1, data, "films.jsonl")
+
+    assert saved == 20
+    assert set(await load_films(1)) == {row["name"] for row in rows}
+
+
+@pytest.mark.asyncio
+async def test_invalid_rows_are_skipped_and_reported(temp_db):
+    data = (
+        "name,rating,year\n"
+        "Good,7,2001\n"
+        "Bad rating,0,2001\n"
+        ",5,2001\n"
+        "Also good,5.5,1999\n"
+    ).encode()
+
+    saved, report = await import_bytes(1, data, "films.csv")
+
+    assert saved == 2
+    assert report.skipped == 2
+    assert report.errors[0].startswith("row 2:")
+
+
+@pytest.mark.asyncio
+async def test_broken_json_stops_import(temp_db):
+    data = b'[{"name": "A", "rating": 5, "year": 2000}, {"name": '
+
+    saved, report = await import_bytes(1, data, "films.json")
+
+    assert saved == 1
+    assert report.failure
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_invalidates_cached_collection(temp_db):
+    await save_film(1, FILM)
+    await load_films(1)
+    await save_films_bulk(1, [{**FILM, "name": "Heat"}])
+    assert set(await load_films(1)) == {FILM["name"], "Heat"}
+
+
+@pytest.mark.asyncio
+async def test_import_of_10k_rows_is_fast(temp_db):
+    lines = ["name,rating,year,genre,description,tag"]
+    lines += [
+        f"Film {i},{1 + i % 10},{1950 + i % 70},Drama,Plot {i},viewed"
+        for i in range(10000)
+    ]
+    data = "\n".join(lines).encode()
+
+    started = time.perf_counter()
+    saved, report = await import_bytes(1, data, "films.csv")
+    elapsed = time.perf_counter() - started
+
+    assert saved == 10000
+    assert elapsed < 5
+
+
+class DummyBot:
+    def __init__(self, data):
+        self.data = data
+
+    async def download(self, document, destination):
+        destination.write(self.data)
+        destination.seek(0)
+
+
+@pytest.mark.asyncio
+async def test_import_handler_reports_counts(temp_db):
+    data = b"name,rating,year\nHeat,8,1995\nBroken,x,1995\n"
+    message = DummyMessage(
+        document=SimpleNamespace(file_name="films.csv", file_size=len(data))
+    )
+    state = DummyState()
+    await state.set_state(TransferState.waiting_for_file)
+
+    await import_file(message, state, DummyBot(data))
+
+    assert state.state is None
+    assert "Imported 1 films, skipped 1." in message.texts[0]
+    assert "Heat" in await load_films(1)
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from webhook import SECRET_HEADER, UPDATE_RUNNER, create_app
+
+
+def make_update(update_id, text="/start", user_id=42):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+async def make_client(handle_update, **kwargs):
+    app = create_app(handle_update, "/webhook", **kwargs)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_webhook_dispatches_updates():
+    received = []
+
+    async def handle_update(data):
+        received.append(data["update_id"])
+
+    client = await make_client(handle_update, secret="s3cret")
+    try:
+        response = await client.post(
+            "/webhook", json=make_update(1), headers={SECRET_HEADER: "s3cret"}
+        )
+        assert response.status == 200
+        await client.app[UPDATE_RUNNER].drain()
+        assert received == [1]
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret_and_bad_body():
+    async def handle_update(data):
+        raise AssertionError("must not be called")
+
+    client = await make_client(handle_update, secret="s3cret")
+    try:
+        response = await client.post(
+            "/webhook", json=make_update(1), headers={SECRET_HEADER: "nope"}
+        )
+        assert response.status == 401
+        response = await client.post(
+            "/webhook", data="not json", headers={SECRET_HEADER: "s3cret"}
+        )
+        assert response.status == 400
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_webhook_processes_concurrently_within_limit():
+    active = 0
+    peak = 0
+
+    async def handle_update(data):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+
+    client = await make_client(handle_update, max_concurrency=3)
+    try:
+        responses = await asyncio.gather(
+            *(
+                client.post("/webhook", json=make_update(i, user_id=i))
+                for i in range(10)
+            )
+        )
+        assert all(response.status == 200 for response in responses)
+        await client.app[UPDATE_RUNNER].drain()
+        assert peak == 3
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_webhook_survives_handler_errors():
+    async def handle_update(data):
+        raise RuntimeError("boom")
+
+    client = await make_client(handle_update)
+    try:
+        for update_id in range(3):
+            response = await client.post("/webhook", json=make_update(update_id))
+            assert response.status == 200
+        await client.app[UPDATE_RUNNER].drain()
+        assert client.app[UPDATE_RUNNER].in_flight == 0
+    finally:
+        await client.close()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from config import (
+    API_KEY,
+    TMDB_APPEND_TO_RESPONSE,
+    TMDB_BASE_URL,
+    TMDB_MAX_RETRIES,
+    TMDB_RATE_BURST,
+    TMDB_RATE_LIMIT,
+    TMDB_RETRY_BACKOFF,
+    TMDB_RETRY_MAX_DELAY,
+)
+from http_client import get_http_session
+from metrics import TMDB_REQUEST_SECONDS
+from tmdb_cache import cache_key, endpoint_template, is_negative, tmdb_cache
+
+logger = logging.getLogger(__name__)
+
+TMDB_API_URL = TMDB_BASE_URL.rstrip("/")
+TMDB_IMAGE_URL = "https://image.tmdb.org/t/p/w500"
+
+
+class StageLatency:
+    def __init__(self, maxlen=1000):
+        self._samples = defaultdict(lambda: deque(maxlen=maxlen))
+
+    def record(self, stage: str, seconds: float):
+        self._samples[stage].append(seconds)
+
+    @contextmanager
+    def measure(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def summary(self):
+        result = {}
+        for stage, samples in self._samples.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                "count": len(ordered),
+                "avg_ms": sum(ordered) / len(ordered) * 1000,
+                "p50_ms": ordered[len(ordered) // 2] * 1000,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                * 1000,
+            }
+        return result
+
+    def clear(self):
+        self._samples.clear()
+
+
+tmdb_latency = StageLatency()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # Резервуємо токен одразу; якщо їх бракує — чекаємо своєї черги
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+tmdb_rate_limiter = TokenBucket(TMDB_RATE_LIMIT, TMDB_RATE_BURST)
+_inflight = {}
+
+
+def _retry_delay(retry_after, attempt: int):
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (
+                    parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)
+                ).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), TMDB_RETRY_MAX_DELAY)
+    return min(TMDB_RETRY_BACKOFF * 2**attempt, TMDB_RETRY_MAX_DELAY)
+
+
+async def _request(endpoint: str, params: dict):
+    template = endpoint_template(endpoint)
+    for attempt in range(TMDB_MAX_RETRIES + 1):
+        await tmdb_rate_limiter.acquire()
+        with TMDB_REQUEST_SECONDS.time(endpoint=template, status="error") as labels:
+            async with get_http_session().get(
+                f"{TMDB_API_URL}{endpoint}", params={"api_key": API_KEY, **params}
+            ) as resp:
+                status = resp.status
+                labels["status"] = str(status)
+                if status == 429 and attempt < TMDB_MAX_RETRIES:
+                    delay = _retry_delay(resp.headers.get("Retry-After"), attempt)
+                else:
+                    data = await resp.json() if status == 200 else None
+                    return status, data
+        logger.warning(f"TMDb rate limit on {endpoint}, retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+async def _fetch(key: str, endpoint: str, params: dict):
+    status, data = await _request(endpoint, params)
+    # Кешуємо успішні відповіді та "не знайдено", але не тимчасові помилки
+    if status == 200 or is_negative(status, data):
+        await tmdb_cache.set(key, endpoint, status, data)
+    return status, data
+
+
+async def _lookup(key: str, endpoint: str, params: dict):
+    cached = await tmdb_cache.get(key)
+    if cached is not None:
+        return cached
+    return await _fetch(key, endpoint, params)
+
+
+async def tmdb_get(endpoint: str, params: dict):
+    key = cache_key(endpoint, params)
+    # Однакові запити, що вже виконуються, чекають на спільний результат.
+    # Перевірка кешу теж іде всередині спільної задачі: інакше запит міг
+    # завершитися, поки ми читали кеш з диска, і піти в TMDb вдруге
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_lookup(key, endpoint, params))
+        _inflight[key] = task
+        task.add_done_callback(
+            lambda done: _inflight.pop(key) if _inflight.get(key) is done else None
+        )
+    return await asyncio.shield(task)
+
+
+def find_trailer(videos):
+    results = (videos or {}).get("results", [])
+    # Англійські трейлери першими, як і раніше з language=en-US
+    for video in sorted(results, key=lambda v: v.get("iso_639_1") != "en"):
+        if video.get("type") == "Trailer" and video.get("site") == "YouTube":
+            return f"https://www.youtube.com/watch?v={video['key']}"
+    return None
+
+
+async def _fetch_videos(film_id):
+    status, videos = await tmdb_get(f"/movie/{film_id}/videos", {"language": "en-US"})
+    if status != 200:
+        # Якщо відео не вдалося отримати — логувати, але не припиняти
+        logger.error(
+            f"Помилка отримання відео для фільму ID {film_id}: статус {status}"
+        )
+        return None
+    return videos
+
+
+async def fetch_movie(film_id, language: str):
+    params = {"language": language}
+    if not TMDB_APPEND_TO_RESPONSE:
+        # Деталі й відео паралельно, а не одне за одним
+        (status, details), videos = await asyncio.gather(
+            tmdb_get(f"/movie/{film_id}", params), _fetch_videos(film_id)
+        )
+        if status != 200:
+            return status, None, None
+        return status, details, find_trailer(videos)
+
+    # Деталі разом із відео за один запит
+    status, details = await tmdb_get(
+        f"/movie/{film_id}",
+        {
+            **params,
+            "append_to_response": "videos",
+            "include_video_language": f"en,{language[:2]},null",
+        },
+    )
+    if status != 200:
+        return status, None, None
+    videos = details.get("videos")
+    if videos is None:
+        videos = await _fetch_videos(film_id)
+    return status, details, find_trailer(videos)
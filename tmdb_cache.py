@@ -0,0 +1,141 @@
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+
+from config import (
+    TMDB_CACHE_DEFAULT_TTL,
+    TMDB_CACHE_MEMORY_SIZE,
+    TMDB_CACHE_TTL,
+    TMDB_NEGATIVE_TTL,
+)
+from db_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+ID_SEGMENT_RE = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_template(endpoint: str):
+    # /movie/550/videos -> /movie/{id}/videos
+    return ID_SEGMENT_RE.sub("/{id}", endpoint)
+
+
+def cache_key(endpoint: str, params: dict):
+    # api_key не впливає на відповідь і не повинен потрапляти в базу
+    clean = {k: str(v) for k, v in params.items() if k != "api_key"}
+    return f"{endpoint}?{json.dumps(clean, sort_keys=True, ensure_ascii=False)}"
+
+
+def is_negative(status: int, data):
+    if status == 404:
+        return True
+    return isinstance(data, dict) and "results" in data and not data["results"]
+
+
+class TMDbCache:
+    def __init__(self, memory_size: int, ttls: dict, default_ttl, negative_ttl):
+        self.memory_size = memory_size
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def ttl_for(self, endpoint: str, status: int, data):
+        if is_negative(status, data):
+            return self.negative_ttl
+        return self.ttls.get(endpoint_template(endpoint), self.default_ttl)
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str):
+        now = time.time()
+        item = self._memory.get(key)
+        if item is not None:
+            value, expires_at = item
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._memory[key]
+        try:
+            async with db_pool.reader() as db:
+                async with db.execute(
+                    "SELECT status, payload, expires_at FROM tmdb_cache "
+                    "WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ) as cursor:
+                    row = await cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error reading TMDb cache: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        status, payload, expires_at = row
+        value = (status, json.loads(payload) if payload is not None else None)
+        self._remember(key, value, expires_at)
+        self.disk_hits += 1
+        return value
+
+    async def set(self, key: str, endpoint: str, status: int, data):
+        expires_at = time.time() + self.ttl_for(endpoint, status, data)
+        self._remember(key, (status, data), expires_at)
+        try:
+            async with db_pool.writer() as db:
+                await db.execute(
+                    "INSERT OR REPLACE INTO tmdb_cache (key, status, payload, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        key,
+                        status,
+                        (
+                            json.dumps(data, ensure_ascii=False)
+                            if data is not None
+                            else None
+                        ),
+                        expires_at,
+                    ),
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error writing TMDb cache: {e}")
+
+    async def purge_expired(self):
+        try:
+            async with db_pool.writer() as db:
+                await db.execute(
+                    "DELETE FROM tmdb_cache WHERE expires_at <= ?", (time.time(),)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error purging TMDb cache: {e}")
+
+    def clear_memory(self):
+        self._memory.clear()
+
+    def stats(self):
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+
+tmdb_cache = TMDbCache(
+    memory_size=TMDB_CACHE_MEMORY_SIZE,
+    ttls=TMDB_CACHE_TTL,
+    default_ttl=TMDB_CACHE_DEFAULT_TTL,
+    negative_ttl=TMDB_NEGATIVE_TTL,
+)
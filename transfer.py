@@ -0,0 +1,145 @@
+import codecs
+import csv
+import io
+import json
+import os
+
+from aiogram.types import InputFile
+
+from db import FILM_FIELDS, iter_films
+from utils import validate_film_row
+
+EXPORT_FIELDS = ("name", *FILM_FIELDS)
+EXPORT_FORMATS = ("csv", "json")
+READ_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 5
+JSON_SEPARATORS = " \t\r\n,["
+
+
+def _csv_text(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_chunks(user_id: int, fmt: str):
+    if fmt == "csv":
+        # BOM, щоб Excel відкривав кирилицю без танців з кодуванням
+        yield codecs.BOM_UTF8 + _csv_text([EXPORT_FIELDS]).encode("utf-8")
+        async for batch in iter_films(user_id):
+            rows = [(name, *(info[key] for key in FILM_FIELDS)) for name, info in batch]
+            yield _csv_text(rows).encode("utf-8")
+        return
+
+    separator = "\n"
+    yield b"["
+    async for batch in iter_films(user_id):
+        items = ",\n".join(
+            json.dumps({"name": name, **info}, ensure_ascii=False)
+            for name, info in batch
+        )
+        yield (separator + items).encode("utf-8")
+        separator = ",\n"
+    yield b"\n]\n"
+
+
+class CollectionExport(InputFile):
+    # Файл збирається під час відправки: колекція не лежить у пам'яті цілком
+    def __init__(self, user_id: int, fmt: str):
+        super().__init__(filename=f"films.{fmt}")
+        self.user_id = user_id
+        self.fmt = fmt
+
+    async def read(self, bot):
+        async for chunk in export_chunks(self.user_id, self.fmt):
+            yield chunk
+
+
+def detect_format(filename, head: bytes):
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".json", ".jsonl", ".ndjson"):
+        return "json"
+    head = head.removeprefix(codecs.BOM_UTF8).lstrip()
+    return "json" if head[:1] in (b"[", b"{") else "csv"
+
+
+def _normalize_row(row: dict):
+    return {
+        str(key).strip().lower(): value for key, value in row.items() if key is not None
+    }
+
+
+def iter_csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.DictReader(text):
+            yield _normalize_row(row)
+    finally:
+        text.detach()
+
+
+def iter_json_rows(stream):
+    # Підтримує і JSON-масив, і JSON Lines; документ читається шматками,
+    # тому в пам'яті одночасно лише поточний шматок і недочитаний об'єкт
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    buffer = ""
+    try:
+        while True:
+            chunk = text.read(READ_CHUNK_SIZE)
+            buffer += chunk
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in JSON_SEPARATORS:
+                    pos += 1
+                if pos >= len(buffer) or buffer[pos] == "]":
+                    break
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        raise ValueError(f"invalid JSON near: {buffer[pos:pos + 40]!r}")
+                    # Об'єкт обірвався на межі шматка — дочитуємо
+                    break
+                yield _normalize_row(item) if isinstance(item, dict) else item
+            buffer = buffer[pos:]
+            if not chunk:
+                if buffer.strip() not in ("", "]"):
+                    raise ValueError(f"invalid JSON near: {buffer[:40]!r}")
+                return
+    finally:
+        text.detach()
+
+
+def iter_rows(stream, fmt: str):
+    return iter_csv_rows(stream) if fmt == "csv" else iter_json_rows(stream)
+
+
+class ImportReport:
+    def __init__(self):
+        self.valid = 0
+        self.skipped = 0
+        self.errors = []
+        self.failure = None
+
+    def films(self, rows):
+        # Помилки розбору файлу не мають потрапити в save_films_bulk:
+        # зупиняємо імпорт на цьому місці й повідомляємо користувачу
+        try:
+            for number, row in enumerate(rows, start=1):
+                if isinstance(row, dict):
+                    valid, result = validate_film_row(row)
+                else:
+                    valid, result = False, "expected an object."
+                if valid:
+                    self.valid += 1
+                    yield result
+                    continue
+                self.skipped += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append(f"row {number}: {result}")
+        except (ValueError, csv.Error) as e:
+            # UnicodeDecodeError теж є ValueError
+            self.failure = str(e)
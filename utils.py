@@ -1,156 +1,214 @@
-import difflib
-import html
-import logging
-from datetime import datetime
-
-from aiohttp import ClientSession
-
-from config import API_KEY
-
-logger = logging.getLogger(__name__)
-
-
-def validate_text_field(text: str, max_len: int):
-    # Обрізаємо пробіли з обох боків
-    text = text.strip()
-    # Перевіряємо, чи поле не порожнє
-    if not text:
-        return False, "Field cannot be empty."
-    # Перевіряємо, чи не перевищує максимальну довжину
-    if len(text) > max_len:
-        return False, f"Too long (max {max_len} characters)."
-    return True, text
-
-
-def format_film_info(name, info):
-    text = (
-        f"🎬 <b>{html.escape(name)}</b> ({info['year']})\n"
-        f"🎭 Genre: {html.escape(str(info['genre']))}\n"
-        f"⭐ Rating: {info['rating']}/10\n"
-        f"📝 Description: {html.escape(str(info['description']))}\n"
-        f"🏷️ Tag: {html.escape(str(info.get('tag', 'Not set')))}"
-    )
-    review = info.get("review")
-    if review:
-        review_lower = review.lower()
-        if review_lower == "like":
-            text += f"\n🗒️ Review: 👍"
-        elif review_lower == "dislike":
-            text += f"\n🗒️ Review: 👎"
-
-    if info.get("poster_url"):
-        text += f"\n<a href=\"{html.escape(info['poster_url'])}\">Poster</a>"
-    if info.get("trailer"):
-        text += f"\n<a href=\"{html.escape(info['trailer'])}\">Trailer</a>"
-    return text
-
-
-def is_valid_year(year: int, min_year=1888, max_year=None):
-    if max_year is None:
-        max_year = datetime.now().year + 5
-    return min_year <= year <= max_year
-
-
-def is_valid_rating(rating: float):
-    return 1 <= rating <= 10
-
-
-def find_similar_films_by_description(user_input, films, threshold=0.2, top_n=5):
-    user_input = user_input.strip().lower()
-    matched = []
-    for name, info in films.items():
-        description = str(info.get("description", "")).lower()
-        similarity = difflib.SequenceMatcher(None, user_input, description).ratio()
-        if similarity >= threshold:
-            matched.append((similarity, name, info))
-    matched.sort(reverse=True)
-    return matched[:top_n]
-
-
-async def search_tmdb_film(name, user_language):
-    try:
-        # Відповідність мов користувача форматам TMDB
-        lang_map = {"ru": "ru-RU", "en": "en-US", "uk": "uk-UA"}
-        tmdb_lang = lang_map.get(user_language[:2], "en-US")  # Вибір мови або дефолт
-
-        # Відкриваємо асинхронну сесію HTTP клієнта
-        async with ClientSession() as session:
-            # Формуємо URL для пошуку фільму
-            search_url = "https://api.themoviedb.org/3/search/movie"
-            params = {"api_key": API_KEY, "query": name, "language": tmdb_lang}
-            # Виконуємо запит на пошук фільму
-            async with session.get(search_url, params=params) as resp:
-                if resp.status != 200:
-                    # Логування помилки отримання результатів пошуку
-                    logging.error(
-                        f"Помилка пошуку фільму '{name}': статус {resp.status}"
-                    )
-                    return None, None, "Помилка: не вдалося отримати дані з TMDB."
-                data = await resp.json()
-
-            results = data.get("results", [])
-            if not results:
-                return None, None, "Фільм не знайдено."
-
-            film = results[0]
-            film_id = film["id"]
-
-            # Отримання детальної інформації про фільм
-            details_url = f"https://api.themoviedb.org/3/movie/{film_id}"
-            async with session.get(
-                details_url, params={"api_key": API_KEY, "language": tmdb_lang}
-            ) as resp:
-                if resp.status != 200:
-                    logging.error(
-                        f"Помилка отримання деталей фільму ID {film_id}: статус {resp.status}"
-                    )
-                    return None, None, "Помилка: не вдалося отримати деталі фільму."
-                details = await resp.json()
-
-            trailer = None
-            # Отримання відео (трейлерів)
-            videos_url = f"https://api.themoviedb.org/3/movie/{film_id}/videos"
-            async with session.get(
-                videos_url, params={"api_key": API_KEY, "language": "en-US"}
-            ) as resp:
-                if resp.status != 200:
-                    # Якщо відео не вдалося отримати — логувати, але не припиняти
-                    logging.error(
-                        f"Помилка отримання відео для фільму ID {film_id}: статус {resp.status}"
-                    )
-                    trailer = None
-                else:
-                    videos_data = await resp.json()
-                    for video in videos_data.get("results", []):
-                        if video["type"] == "Trailer" and video["site"] == "YouTube":
-                            trailer = f"https://www.youtube.com/watch?v={video['key']}"
-                            break
-
-            # Витягуємо основні дані про фільм
-            title = details.get("title", "No name")
-            year = details.get("release_date", "")[:4]
-            genres = ", ".join([g["name"] for g in details.get("genres", [])])
-            rating = round(float(details.get("vote_average", 0)), 1)
-            overview = details.get("overview", "No description.")
-            poster_url = (
-                f"https://image.tmdb.org/t/p/w500{details['poster_path']}"
-                if details.get("poster_path")
-                else None
-            )
-
-            film_data = {
-                "year": year,
-                "genre": genres,
-                "rating": rating,
-                "description": overview,
-                "poster_url": poster_url,
-                "trailer": trailer,
-            }
-
-            # Повертаємо назву, словник з даними та форматований текст
-            return title, film_data, format_film_info(title, film_data)
-
-    except Exception as e:
-        # Логування серйозної помилки з трасуванням стека
-        logging.exception(f"Критична помилка під час пошуку фільму '{name}': {e}")
-        return None, None, f"Сталася помилка під час пошуку фільму: {e}"
+import asyncio
+import difflib
+import html
+import logging
+import time
+from datetime import datetime
+
+from cache import collection_cache
+from config import MAX_DESC_LEN, MAX_GENRE_LEN, TMDB_BATCH_CONCURRENCY
+from lang import language_resolver
+from similarity import TfidfIndex, tfidf_indexes
+from tmdb import TMDB_IMAGE_URL, fetch_movie, tmdb_get, tmdb_latency
+
+logger = logging.getLogger(__name__)
+
+
+def validate_text_field(text: str, max_len: int):
+    # Обрізаємо пробіли з обох боків
+    text = text.strip()
+    # Перевіряємо, чи поле не порожнє
+    if not text:
+        return False, "Field cannot be empty."
+    # Перевіряємо, чи не перевищує максимальну довжину
+    if len(text) > max_len:
+        return False, f"Too long (max {max_len} characters)."
+    return True, text
+
+
+def format_film_info(name, info):
+    text = (
+        f"🎬 <b>{html.escape(name)}</b> ({info['year']})\n"
+        f"🎭 Genre: {html.escape(str(info['genre']))}\n"
+        f"⭐ Rating: {info['rating']}/10\n"
+        f"📝 Description: {html.escape(str(info['description']))}\n"
+        f"🏷️ Tag: {html.escape(str(info.get('tag', 'Not set')))}"
+    )
+    review = info.get("review")
+    if review:
+        review_lower = review.lower()
+        if review_lower == "like":
+            text += f"\n🗒️ Review: 👍"
+        elif review_lower == "dislike":
+            text += f"\n🗒️ Review: 👎"
+
+    if info.get("poster_url"):
+        text += f"\n<a href=\"{html.escape(info['poster_url'])}\">Poster</a>"
+    if info.get("trailer"):
+        text += f"\n<a href=\"{html.escape(info['trailer'])}\">Trailer</a>"
+    return text
+
+
+def is_valid_year(year: int, min_year=1888, max_year=None):
+    if max_year is None:
+        max_year = datetime.now().year + 5
+    return min_year <= year <= max_year
+
+
+def is_valid_rating(rating: float):
+    return 1 <= rating <= 10
+
+
+def _is_url(value):
+    return value.startswith("http://") or value.startswith("https://")
+
+
+def validate_film_row(row: dict):
+    # Ті самі правила, що й у діалозі "Add film", але для рядка з файлу імпорту
+    def text(key):
+        value = row.get(key)
+        return "" if value is None else str(value).strip()
+
+    valid, name = validate_text_field(text("name"), 100)
+    if not valid:
+        return False, f"name: {name}"
+    try:
+        rating = float(text("rating").replace(",", "."))
+        year = int(float(text("year")))
+    except (ValueError, OverflowError):
+        return False, "rating and year must be numbers."
+    if not is_valid_rating(rating):
+        return False, "rating must be from 1 to 10."
+    if not is_valid_year(year):
+        return False, "year is out of range."
+
+    film = {"name": name, "rating": rating, "year": year}
+    for key, max_len in (("genre", MAX_GENRE_LEN), ("description", MAX_DESC_LEN)):
+        # Фільми з TMDb бувають без жанру чи опису, тож поле може бути порожнім
+        valid, value = validate_text_field(text(key), max_len)
+        if not valid and text(key):
+            return False, f"{key}: {value}"
+        film[key] = value if valid else ""
+
+    tag = text("tag").lower()
+    if tag not in ("", "viewed", "not viewed"):
+        return False, "tag must be 'viewed' or 'not viewed'."
+    review = text("review").lower()
+    if review not in ("", "skip", "like", "dislike"):
+        return False, "review must be 'like' or 'dislike'."
+    film["tag"] = tag or None
+    film["review"] = review if review in ("like", "dislike") else None
+    for key in ("poster_url", "trailer"):
+        film[key] = text(key) if _is_url(text(key)) else None
+    return True, film
+
+
+def find_similar_films_by_description(
+    user_input, films, threshold=0.2, top_n=5, engine="difflib", user_id=None
+):
+    if engine == "tfidf":
+        # Векторизований TF-IDF по символьних n-грамах; індекс кешується лише
+        # для актуальної копії колекції з collection_cache
+        index = (
+            tfidf_indexes.get(user_id, films, collection_cache.cached_version(user_id))
+            if user_id is not None
+            else TfidfIndex.from_films(films)
+        )
+        return [
+            (similarity, name, films[name])
+            for similarity, name in index.search(user_input, threshold, top_n)
+            if name in films
+        ]
+
+    user_input = user_input.strip().lower()
+    matched = []
+    for name, info in films.items():
+        description = str(info.get("description", "")).lower()
+        similarity = difflib.SequenceMatcher(None, user_input, description).ratio()
+        if similarity >= threshold:
+            matched.append((similarity, name, info))
+    matched.sort(reverse=True)
+    return matched[:top_n]
+
+
+async def search_tmdb_film(name, user_language):
+    try:
+        # Відповідність мов користувача форматам TMDB
+        lang_map = {"ru": "ru-RU", "en": "en-US", "uk": "uk-UA"}
+        tmdb_lang = lang_map.get(user_language[:2], "en-US")  # Вибір мови або дефолт
+
+        started = time.perf_counter()
+        # Виконуємо запит на пошук фільму (відповіді TMDb кешуються)
+        with tmdb_latency.measure("search"):
+            status, data = await tmdb_get(
+                "/search/movie", {"query": name, "language": tmdb_lang}
+            )
+        if status != 200:
+            # Логування помилки отримання результатів пошуку
+            logging.error(f"Помилка пошуку фільму '{name}': статус {status}")
+            return None, None, "Помилка: не вдалося отримати дані з TMDB."
+
+        results = data.get("results", [])
+        if not results:
+            return None, None, "Фільм не знайдено."
+
+        film = results[0]
+        film_id = film["id"]
+
+        # Деталі фільму разом із трейлером (append_to_response=videos)
+        with tmdb_latency.measure("details"):
+            status, details, trailer = await fetch_movie(film_id, tmdb_lang)
+        if status != 200:
+            logging.error(
+                f"Помилка отримання деталей фільму ID {film_id}: статус {status}"
+            )
+            return None, None, "Помилка: не вдалося отримати деталі фільму."
+        tmdb_latency.record("lookup", time.perf_counter() - started)
+
+        # Витягуємо основні дані про фільм
+        title = details.get("title", "No name")
+        year = details.get("release_date", "")[:4]
+        genres = ", ".join([g["name"] for g in details.get("genres", [])])
+        rating = round(float(details.get("vote_average", 0)), 1)
+        overview = details.get("overview", "No description.")
+        poster_url = (
+            f"{TMDB_IMAGE_URL}{details['poster_path']}"
+            if details.get("poster_path")
+            else None
+        )
+
+        film_data = {
+            "tmdb_id": film_id,
+            "year": year,
+            "genre": genres,
+            "rating": rating,
+            "description": overview,
+            "poster_url": poster_url,
+            "trailer": trailer,
+        }
+
+        # Повертаємо назву, словник з даними та форматований текст
+        return title, film_data, format_film_info(title, film_data)
+
+    except Exception as e:
+        # Логування серйозної помилки з трасуванням стека
+        logging.exception(f"Критична помилка під час пошуку фільму '{name}': {e}")
+        return None, None, f"Сталася помилка під час пошуку фільму: {e}"
+
+
+async def search_tmdb_films(
+    names, language_code=None, concurrency=TMDB_BATCH_CONCURRENCY, on_done=None
+):
+    # Пошук списку назв паралельно, але не більше concurrency одночасно:
+    # кожен пошук — це кілька запитів, а TMDb і так обмежує частоту
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(name):
+        async with semaphore:
+            user_lang = await language_resolver.resolve(name, language_code)
+            title, film_data, _ = await search_tmdb_film(name, user_lang)
+        if on_done is not None:
+            on_done(name, title)
+        return name, title, film_data
+
+    return await asyncio.gather(*(lookup(name) for name in names))
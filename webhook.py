@@ -0,0 +1,105 @@
+import asyncio
+import hmac
+import logging
+
+from aiohttp import web
+
+from config import WEBHOOK_MAX_CONCURRENCY
+from supervisor import update_user_id
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdateRunner:
+    def __init__(self, handle_update, max_concurrency: int):
+        self.handle_update = handle_update
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks = set()
+        # Остання задача кожного користувача: наступна чекає на неї
+        self._tails = {}
+
+    @property
+    def in_flight(self):
+        return len(self._tasks)
+
+    async def submit(self, data: dict):
+        # Якщо всі слоти зайняті, Telegram чекає на відповідь — це і є backpressure
+        await self._semaphore.acquire()
+        user_id = update_user_id(data)
+        previous = self._tails.get(user_id) if user_id is not None else None
+        task = asyncio.create_task(self._run(data, previous))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if user_id is not None:
+            self._tails[user_id] = task
+            task.add_done_callback(lambda done: self._forget(user_id, done))
+
+    def _forget(self, user_id, task):
+        if self._tails.get(user_id) is task:
+            del self._tails[user_id]
+
+    async def _run(self, data: dict, previous=None):
+        try:
+            if previous is not None:
+                # Різні користувачі обробляються паралельно, а апдейти одного —
+                # строго в порядку надходження, інакше FSM побачить їх не по черзі
+                await asyncio.wait((previous,))
+            await self.handle_update(data)
+        except Exception as e:
+            logger.error(f"Error processing update {data.get('update_id')}: {e}")
+        finally:
+            self._semaphore.release()
+
+    async def drain(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+UPDATE_RUNNER = web.AppKey("update_runner", UpdateRunner)
+
+
+def create_app(
+    handle_update,
+    path: str,
+    secret: str = "",
+    max_concurrency: int = WEBHOOK_MAX_CONCURRENCY,
+):
+    runner = UpdateRunner(handle_update, max_concurrency)
+
+    async def receive(request):
+        if secret and not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ""), secret
+        ):
+            return web.Response(status=401)
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(data, dict) or "update_id" not in data:
+            return web.Response(status=400)
+        # Відповідаємо одразу, обробка йде паралельно з наступними апдейтами
+        await runner.submit(data)
+        return web.Response()
+
+    async def on_shutdown(app):
+        await runner.drain()
+
+    app = web.Application()
+    app[UPDATE_RUNNER] = runner
+    app.router.add_post(path, receive)
+    app.on_shutdown.append(on_shutdown)
+    return app
+
+
+async def serve(app, host: str, port: int):
+    app_runner = web.AppRunner(app)
+    await app_runner.setup()
+    site = web.TCPSite(app_runner, host, port)
+    await site.start()
+    logger.info(f"Listening for webhook updates on {host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await app_runner.cleanup()